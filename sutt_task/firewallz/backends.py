@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+def normalize_email(email):
+    return email.strip().lower()
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticates players by email with one query and one password check. Player
+    usernames are their lower-cased email (see UserRegistrationForm and the roster
+    import), so the lookup goes through the unique username index.
+
+    Only ``authenticate(email=..., password=...)`` calls are handled; calls with a
+    ``username`` fall through to ModelBackend, so no password is ever checked twice.
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.get(username=normalize_email(email))
+        except UserModel.DoesNotExist:
+            # Hash anyway so a missing account takes as long as a wrong password
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,249 @@
+import json
+import statistics
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import urls
+from .metrics import percentile
+from .models import College, Player, SportPayment, TeamPlayer
+
+# Routes that change state (or end the session) on GET, or that only the payment gateway
+# or the holder of an activation link can call, and so cannot be replayed
+SKIPPED_ROUTES = {
+    "logout_player",
+    "admin_logout",
+    "edit_profile",
+    "make_base_payment",
+    "make_sport_payment",
+    "approve_player",
+    "approve_players",
+    "mark_coach_paid",
+    "approve_team",
+    "approve_teams",
+    "payment_callback",
+    "local_gateway_checkout",
+    "activate_account",
+}
+
+
+def benchmark_host():
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*" and not host.startswith("."):
+            return host
+    return "localhost"
+
+
+def benchmark_player(email=None):
+    """
+    A player with a paid team registration, so every player page has something to show.
+    ``email`` picks a specific player instead of the oldest one.
+    """
+    team_players = TeamPlayer.objects.select_related("player", "team").order_by("created_at")
+    if email:
+        team_players = team_players.filter(player__email=email)
+    payment = (
+        SportPayment.objects
+        .filter(transaction_status="SUCCESS", team_player__in=team_players.values("pk"))
+        .select_related("team_player__player", "team_player__team")
+        .order_by("created_at")
+        .first()
+    )
+    if payment:
+        return payment.team_player.player, payment.team_player
+    team_player = team_players.first()
+    if team_player:
+        return team_player.player, team_player
+    players = Player.objects.filter(email=email) if email else Player.objects.order_by("created_at")
+    return players.first(), None
+
+
+@contextmanager
+def benchmark_admin(username=None):
+    """
+    The admin ``username``, or a temporary admin with no usable password that is
+    deleted again when the run ends, so benchmarking a live database leaves no account
+    """
+    User = get_user_model()
+    if username:
+        yield User.objects.get(username=username, user_type="admin")
+        return
+    admin = User(username=f"benchmark-admin-{uuid.uuid4().hex}", user_type="admin")
+    admin.set_unusable_password()
+    admin.save()
+    try:
+        yield admin
+    finally:
+        admin.delete()
+
+
+def url_kwargs(pattern, player, team_player):
+    """
+    Fills the uuid converters of a route from the benchmark player's own objects
+    """
+    college = player.college if player else College.objects.order_by("created_at").first()
+    values = {
+        "team_id": team_player.team_id if team_player else None,
+        "tp_id": team_player.pk if team_player else None,
+        "team_player_id": team_player.pk if team_player else None,
+        "player_id": player.pk if player else None,
+        "college_id": college.pk if college else None,
+        "transaction_id": None,
+    }
+    if team_player and "transaction_id" in pattern.pattern.converters:
+        values["transaction_id"] = (
+            SportPayment.objects
+            .filter(team_player=team_player, transaction_status="SUCCESS")
+            .values_list("transaction_id", flat=True)
+            .first()
+        )
+    kwargs = {}
+    for name in pattern.pattern.converters:
+        if values.get(name) is None:
+            return None
+        kwargs[name] = values[name]
+    return kwargs
+
+
+def timed_get(client, path):
+    with ExitStack() as stack:
+        contexts = [
+            stack.enter_context(CaptureQueriesContext(connection))
+            for connection in connections.all()
+        ]
+        start = time.perf_counter()
+        response = client.get(path)
+        if response.streaming:
+            # Streamed bodies are only read from the database as they are consumed
+            b"".join(response.streaming_content)
+        wall = time.perf_counter() - start
+    return response, wall, sum(len(context) for context in contexts)
+
+
+def run_benchmarks(iterations=20, only=None, player_email=None, admin_username=None, stdout=None):
+    """
+    Requests every replayable route in firewallz/urls.py through the test client,
+    logged in as a player for ``player/`` routes and as an admin for ``admin/`` routes,
+    and returns a JSON-serialisable report with p50/p95 latency and query counts per view.
+    One untimed warm-up request per view keeps template compilation out of the numbers.
+    ``admin_username`` names an existing admin; by default a temporary one is used.
+    """
+    player, team_player = benchmark_player(player_email)
+    host = benchmark_host()
+    anonymous = Client(SERVER_NAME=host)
+    player_client = Client(SERVER_NAME=host)
+    if player:
+        player_client.force_login(player.auth_user)
+    admin_client = Client(SERVER_NAME=host)
+
+    views = {}
+    skipped = []
+    with benchmark_admin(admin_username) as admin:
+        admin_client.force_login(admin)
+        for pattern in urls.urlpatterns:
+            name = pattern.name or pattern.callback.__name__
+            if name in SKIPPED_ROUTES or (only and name not in only):
+                continue
+            kwargs = url_kwargs(pattern, player, team_player)
+            if kwargs is None:
+                skipped.append(name)
+                continue
+            path = reverse(pattern.callback, kwargs=kwargs)
+            route = str(pattern.pattern)
+            if route.startswith("player/"):
+                client = player_client
+            elif route.startswith("admin/"):
+                client = admin_client
+            else:
+                client = anonymous
+
+            timed_get(client, path)
+            walls, queries, status = [], [], None
+            for _ in range(iterations):
+                response, wall, count = timed_get(client, path)
+                status = response.status_code
+                walls.append(wall)
+                queries.append(count)
+            walls.sort()
+            views[name] = {
+                "path": path,
+                "status": status,
+                "p50_ms": round(percentile(walls, 50) * 1000, 3),
+                "p95_ms": round(percentile(walls, 95) * 1000, 3),
+                "queries": statistics.median_high(queries),
+                "max_queries": max(queries),
+            }
+            if stdout:
+                row = views[name]
+                stdout.write(
+                    f"{name:<32} {row['status']:>3}  p50 {row['p50_ms']:>8.2f} ms  "
+                    f"p95 {row['p95_ms']:>8.2f} ms  {row['queries']:>4} queries"
+                )
+        # Ends the admin's session before a temporary admin is deleted
+        admin_client.logout()
+
+    return {
+        "meta": {
+            "created_at": timezone.now().isoformat(),
+            "vendor": connections["default"].vendor,
+            "iterations": iterations,
+            "players": Player.objects.count(),
+            "colleges": College.objects.count(),
+            "team_players": TeamPlayer.objects.count(),
+        },
+        "views": views,
+        "skipped": skipped,
+    }
+
+
+def compare_reports(baseline, current, threshold=0.2):
+    """
+    Lists the views of ``current`` that regressed against ``baseline``: any increase in
+    query count, or a p95 more than ``threshold`` (a fraction) above the baseline's
+    """
+    regressions = []
+    for name, row in current["views"].items():
+        before = baseline["views"].get(name)
+        if before is None:
+            continue
+        if row["queries"] > before["queries"]:
+            regressions.append(f"{name}: {before['queries']} -> {row['queries']} queries")
+        if row["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.2f} -> {row['p95_ms']:.2f} ms")
+    return regressions
+
+
+def format_comparison(baseline, current):
+    """
+    Side-by-side lines for the views present in both reports. Run the benchmark once per
+    DATABASE_URL to compare backends, e.g. a SQLite baseline against PostgreSQL.
+    """
+    left, right = baseline["meta"]["vendor"], current["meta"]["vendor"]
+    lines = [f"{'view':<32} {left + ' p95':>14} {right + ' p95':>14} {'queries':>9}"]
+    for name, row in current["views"].items():
+        before = baseline["views"].get(name)
+        if before is None:
+            continue
+        lines.append(
+            f"{name:<32} {before['p95_ms']:>11.2f} ms {row['p95_ms']:>11.2f} ms "
+            f"{before['queries']:>4} {row['queries']:>4}"
+        )
+    return lines
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
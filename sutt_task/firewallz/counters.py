@@ -0,0 +1,107 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Group, RegistrationCounter, TeamPlayer
+
+
+def count_for(scope, *ids):
+    """
+    Counts the rows behind a counter key straight from the registration tables
+    """
+    if scope == "event":
+        college_id, event_id = ids
+        return TeamPlayer.objects.filter(events=event_id, player__college_id=college_id).count()
+    if scope == "group":
+        (group_id,) = ids
+        return Group.players.through.objects.filter(group_id=group_id).count()
+    raise ValueError(f"Unknown counter scope {scope}")
+
+
+def lock_counter(scope, *ids):
+    """
+    Returns the counter row for a key, creating it if needed, locked until the end of the
+    surrounding transaction so concurrent writers to the same key are serialized
+    """
+    key = RegistrationCounter.make_key(scope, *ids)
+    # Writing first takes the lock up front (the row lock on PostgreSQL, the write lock
+    # on SQLite) instead of upgrading a read lock later, which could deadlock
+    if not RegistrationCounter.objects.filter(key=key).update(updated_at=timezone.now()):
+        RegistrationCounter.objects.get_or_create(key=key, defaults={"scope": scope})
+    return RegistrationCounter.objects.select_for_update().get(key=key)
+
+
+def refresh_counter(scope, *ids):
+    """
+    Recounts a single key under its row lock. Because the recount happens after the
+    lock is taken, the last writer to commit always stores the complete count.
+    """
+    with transaction.atomic():
+        counter = lock_counter(scope, *ids)
+        counter.count = count_for(scope, *ids)
+        counter.save(update_fields=["count", "updated_at"])
+    return counter.count
+
+
+def adjust_counter(scope, ids, delta):
+    """
+    Adds ``delta`` to a counter in a single UPDATE. A key without a row yet is counted
+    from scratch instead, which already includes the change that triggered this.
+    """
+    if not delta:
+        return
+    key = RegistrationCounter.make_key(scope, *ids)
+    if not RegistrationCounter.objects.filter(key=key).update(count=F("count") + delta, updated_at=timezone.now()):
+        refresh_counter(scope, *ids)
+
+
+def event_links(**filters):
+    """
+    (college id, event id) of every link between a non-deleted TeamPlayer and an event
+    that matches ``filters`` on the through table, in one query
+    """
+    return list(
+        TeamPlayer.events.through._base_manager
+        .filter(teamplayer__is_deleted=False, **filters)
+        .values_list("teamplayer__player__college_id", "event_id")
+    )
+
+
+def adjust_event_counters(links, sign):
+    for (college_id, event_id), n in Counter(links).items():
+        adjust_counter("event", (college_id, event_id), sign * n)
+
+
+def adjust_group_counters(group_ids, sign):
+    for group_id, n in Counter(group_ids).items():
+        adjust_counter("group", (group_id,), sign * n)
+
+
+def rebuild_counters():
+    """
+    Recomputes every counter from scratch with one grouped query per scope
+    """
+    counts = {}
+    # Matches TeamPlayer.objects.filter(events=..., player__college=...) in register_for_sports
+    event_rows = (
+        TeamPlayer.events.through._base_manager.filter(teamplayer__is_deleted=False)
+        .values("teamplayer__player__college_id", "event_id").annotate(n=Count("teamplayer_id", distinct=True))
+    )
+    for row in event_rows:
+        counts[("event", row["teamplayer__player__college_id"], row["event_id"])] = row["n"]
+    group_rows = Group.players.through._base_manager.values("group_id").annotate(n=Count("pk"))
+    for row in group_rows:
+        counts[("group", row["group_id"])] = row["n"]
+
+    with transaction.atomic():
+        RegistrationCounter._base_manager.all().delete()
+        RegistrationCounter._base_manager.bulk_create(
+            [
+                RegistrationCounter(scope=key[0], key=RegistrationCounter.make_key(*key), count=count)
+                for key, count in counts.items()
+            ],
+            batch_size=1000,
+        )
+    return len(counts)
@@ -0,0 +1,111 @@
+import csv
+from itertools import chain, groupby
+
+from django.db.models import FilteredRelation, Q, Value
+from django.http import StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+
+PLAYER_COLUMNS = [
+    ("name", "Name"),
+    ("email", "Email"),
+    ("phone_number", "Phone"),
+    ("gender", "Gender"),
+    ("college__name", "College"),
+    ("is_coach", "Coach"),
+    ("status", "PCR Status"),
+    ("verified_by_firewallz", "Firewallz Verified"),
+    ("created_at", "Registered At"),
+]
+
+TEAM_COLUMNS = [
+    ("team_code", "Team Code"),
+    ("sport__name", "Sport"),
+    ("sport__gender", "Category"),
+    ("college__name", "College"),
+    ("captain__name", "Captain"),
+    ("is_verified_by_firewallz", "Firewallz Verified"),
+]
+
+PAYMENT_HEADER = [
+    "Type", "Payment ID", "Status", "Amount", "Player", "Email", "College", "Sport",
+    "Reference No", "Transaction Status", "Created At",
+]
+
+
+class Echo:
+    """
+    File-like object for csv.writer that hands each formatted line back instead of
+    buffering it
+    """
+
+    def write(self, value):
+        return value
+
+
+def spreadsheet_safe(value):
+    # Keep user-entered text such as "=HYPERLINK(...)" from being run as a formula
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value
+    return value
+
+
+def csv_response(filename, header, rows):
+    """
+    Streams ``rows`` as a CSV attachment, one line at a time
+    """
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow([spreadsheet_safe(value) for value in row])
+
+    response = StreamingHttpResponse(lines(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def pinned(queryset):
+    # The rows are read while the response streams, after the view (and any
+    # read_from_replica routing around it) has returned, so fix the database now
+    return queryset.using(queryset.db)
+
+
+def player_rows(players):
+    fields = [field for field, _ in PLAYER_COLUMNS]
+    return pinned(players).values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def team_rows(teams):
+    """
+    One row per team with its members joined into the last column. ``teams`` must be
+    ordered on a unique key so the joined rows of each team arrive together.
+    """
+    fields = ["pk", *(field for field, _ in TEAM_COLUMNS), "members__player__name"]
+    rows = (
+        pinned(teams)
+        .alias(members=FilteredRelation("team_players", condition=Q(team_players__is_deleted=False)))
+        .values_list(*fields)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for _, group in groupby(rows, key=lambda row: row[0]):
+        group = list(group)
+        members = [row[-1] for row in group if row[-1]]
+        yield [*group[0][1:-1], "; ".join(members)]
+
+
+def payment_rows(base_payments, sport_payments):
+    base = pinned(base_payments).values_list(
+        Value("BASE"), "static_id", "transaction_status", "amount", "player__name", "player__email",
+        "player__college__name", Value(""), "transaction__reference_no", "transaction__status", "created_at",
+    )
+    sport = pinned(sport_payments).values_list(
+        Value("SPORT"), "static_id", "transaction_status", "amount", "team_player__player__name",
+        "team_player__player__email", "team_player__team__college__name", "team_player__team__sport__name",
+        "transaction__reference_no", "transaction__status", "created_at",
+    )
+    return chain(
+        base.iterator(chunk_size=EXPORT_CHUNK_SIZE),
+        sport.iterator(chunk_size=EXPORT_CHUNK_SIZE),
+    )
@@ -0,0 +1,214 @@
+import random
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .counters import rebuild_counters
+from .models import (
+    BASE_PAYMENT_AMOUNT, MAX_EVENTS_PER_PLAYER, SPORT_PAYMENT_AMOUNT, SPORTS_NAMES,
+    BasePayment, College, Event, Group, Player, Sport, SportPayment, Team, TeamPlayer,
+    Transaction, UserProfile,
+)
+from .reference import invalidate_reference_data
+from .stats import invalidate_dashboard_stats
+
+BENCHMARK_PASSWORD = "benchmark-password"
+EVENT_NAMES = ["Singles", "Doubles", "Open", "Relay"]
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Kavya", "Rohan", "Sara", "Vihaan", "Anika", "Arjun", "Meera"]
+LAST_NAMES = ["Sharma", "Iyer", "Reddy", "Khan", "Das", "Mehta", "Nair", "Singh", "Bose", "Patel"]
+
+
+def ensure_sports(num_sports, rng):
+    """
+    Makes sure the first ``num_sports`` sport names exist for both genders, each with
+    a handful of events, and returns {sport: [events]}
+    """
+    events_by_sport = {}
+    for name, _ in SPORTS_NAMES[:num_sports]:
+        for gender in ("Male", "Female"):
+            sport, _ = Sport.objects.get_or_create(
+                name=name, gender=gender, defaults={"max_players": rng.randint(8, 20)}
+            )
+            events = list(sport.events.all())
+            if not events:
+                events = Event.objects.bulk_create([
+                    Event(sport=sport, name=event_name)
+                    for event_name in EVENT_NAMES[:rng.randint(1, len(EVENT_NAMES))]
+                ])
+            events_by_sport[sport] = events
+    return events_by_sport
+
+
+def generate_fest_data(
+    colleges=200,
+    players_per_college=50,
+    sports=len(SPORTS_NAMES),
+    teams_per_college=8,
+    batch_size=1000,
+    chunk_colleges=20,
+    seed=None,
+    tag=None,
+    stdout=None,
+):
+    """
+    Generates a synthetic fest with ``bulk_create``: colleges, players with their auth
+    users and profiles, teams, TeamPlayers with events, groups, base and sport payments.
+    Work is committed in chunks of ``chunk_colleges`` colleges so memory stays flat.
+    Every account shares BENCHMARK_PASSWORD, hashed once. Bulk inserts send no signals,
+    so the registration counters, dashboard and reference caches are rebuilt at the end.
+    """
+    rng = random.Random(seed)
+    tag = tag or uuid.uuid4().hex[:6]
+    User = get_user_model()
+    password = make_password(BENCHMARK_PASSWORD)
+    events_by_sport = ensure_sports(sports, rng)
+    sports_by_gender = {
+        gender: [sport for sport in events_by_sport if sport.gender == gender]
+        for gender in ("Male", "Female")
+    }
+    totals = dict.fromkeys(
+        ["colleges", "players", "teams", "team_players", "events", "transactions"], 0
+    )
+
+    for chunk_start in range(0, colleges, chunk_colleges):
+        chunk = range(chunk_start, min(chunk_start + chunk_colleges, colleges))
+        with transaction.atomic():
+            college_objs = College.objects.bulk_create(
+                [
+                    College(name=f"Bench {tag} College {ci}", address=f"{ci} Campus Road",
+                            city="Pilani", state="Rajasthan")
+                    for ci in chunk
+                ],
+                batch_size=batch_size,
+            )
+
+            users, profiles, players = [], [], []
+            for college, ci in zip(college_objs, chunk):
+                for pi in range(players_per_college):
+                    email = f"{tag}-{ci}-{pi}@bench.test"
+                    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+                    gender = rng.choice(("Male", "Female"))
+                    phone = rng.randint(6000000000, 9999999999)
+                    user = User(username=email, email=email, password=password, user_type="player")
+                    users.append(user)
+                    profiles.append(UserProfile(
+                        auth_user=user, name=name, email=email, phone_number=phone, gender=gender
+                    ))
+                    verified = rng.random() < 0.6
+                    players.append(Player(
+                        auth_user=user, name=name, email=email, phone_number=phone, gender=gender,
+                        college=college, status="pcr_confirmed", verified_by_firewallz=verified,
+                        is_coach=pi == 0,
+                    ))
+            User.objects.bulk_create(users, batch_size=batch_size)
+            UserProfile.objects.bulk_create(profiles, batch_size=batch_size)
+            Player.objects.bulk_create(players, batch_size=batch_size)
+
+            teams = {}
+            for college, ci in zip(college_objs, chunk):
+                for gender, gender_sports in sports_by_gender.items():
+                    for sport in rng.sample(gender_sports, min(teams_per_college // 2, len(gender_sports))):
+                        code = sport.name.replace(" ", "")[:4].upper()
+                        teams[(college.pk, sport.pk)] = Team(
+                            college=college, sport=sport,
+                            team_code=f"{tag}-{ci}-{code}-{gender[0]}-1",
+                            is_verified_by_firewallz=rng.random() < 0.3,
+                        )
+            Team.objects.bulk_create(teams.values(), batch_size=batch_size)
+
+            team_players, through_rows = [], []
+            captains = {}
+            college_teams = {}
+            for (college_id, _), team in teams.items():
+                college_teams.setdefault((college_id, team.sport.gender), []).append(team)
+            for player in players:
+                if player.is_coach:
+                    continue
+                options = college_teams.get((player.college_id, player.gender), [])
+                event_budget = MAX_EVENTS_PER_PLAYER
+                for team in rng.sample(options, min(rng.randint(1, 3), len(options))):
+                    events = events_by_sport[team.sport]
+                    picked = rng.sample(events, min(rng.randint(1, 2), len(events), event_budget))
+                    if not picked:
+                        break
+                    event_budget -= len(picked)
+                    team_player = TeamPlayer(
+                        player=player, team=team, status="pcr_approved", is_playing=True
+                    )
+                    team_players.append(team_player)
+                    captains.setdefault(team.pk, (team, player))
+                    through_rows.extend(
+                        TeamPlayer.events.through(teamplayer_id=team_player.pk, event_id=event.pk)
+                        for event in picked
+                    )
+            TeamPlayer.objects.bulk_create(team_players, batch_size=batch_size)
+            TeamPlayer.events.through.objects.bulk_create(through_rows, batch_size=batch_size)
+            captained = set()
+            for team, player in captains.values():
+                if player.pk not in captained:
+                    team.captain = player
+                    captained.add(player.pk)
+            Team.objects.bulk_update(
+                [team for team, _ in captains.values() if team.captain_id], ["captain"],
+                batch_size=batch_size,
+            )
+
+            groups = Group.objects.bulk_create([
+                Group(name=f"Bench {tag} Group {ci}", college=college)
+                for college, ci in zip(college_objs, chunk)
+            ])
+            members = []
+            for group in groups:
+                college_players = [p for p in players if p.college_id == group.college_id]
+                members.extend(
+                    Group.players.through(group_id=group.pk, player_id=p.pk)
+                    for p in rng.sample(college_players, min(10, len(college_players)))
+                )
+            Group.players.through.objects.bulk_create(members, batch_size=batch_size)
+
+            transactions, base_payments, sport_payments = [], [], []
+            for player in players:
+                if rng.random() < 0.8:
+                    txn = Transaction(
+                        paid_for=player, paid_by=player, amount=BASE_PAYMENT_AMOUNT,
+                        reference_no=uuid.uuid4().hex, type="PLAYER", status="SUCCESS",
+                    )
+                    transactions.append(txn)
+                    base_payments.append(BasePayment(
+                        player=player, transaction=txn, transaction_status="SUCCESS"
+                    ))
+            events_per_team_player = {}
+            for row in through_rows:
+                events_per_team_player[row.teamplayer_id] = events_per_team_player.get(row.teamplayer_id, 0) + 1
+            for team_player in team_players:
+                if rng.random() < 0.5:
+                    amount = events_per_team_player[team_player.pk] * SPORT_PAYMENT_AMOUNT
+                    txn = Transaction(
+                        paid_for=team_player.player, paid_by=team_player.player, amount=amount,
+                        reference_no=uuid.uuid4().hex, type="PLAYER", status="SUCCESS",
+                    )
+                    transactions.append(txn)
+                    sport_payments.append(SportPayment(
+                        team_player=team_player, transaction=txn, amount=amount,
+                        transaction_status="SUCCESS",
+                    ))
+            Transaction.objects.bulk_create(transactions, batch_size=batch_size)
+            BasePayment.objects.bulk_create(base_payments, batch_size=batch_size)
+            SportPayment.objects.bulk_create(sport_payments, batch_size=batch_size)
+
+        totals["colleges"] += len(college_objs)
+        totals["players"] += len(players)
+        totals["teams"] += len(teams)
+        totals["team_players"] += len(team_players)
+        totals["events"] += len(through_rows)
+        totals["transactions"] += len(transactions)
+        if stdout:
+            stdout.write(f"  {totals['colleges']}/{colleges} colleges generated")
+
+    rebuild_counters()
+    invalidate_dashboard_stats()
+    invalidate_reference_data()
+    totals["tag"] = tag
+    return totals
@@ -1,10 +1,54 @@
 from django import forms
 from django.contrib.auth import get_user_model
+from django.forms.models import ModelChoiceIterator
 from .models import UserProfile, College, Player, Sport
+from .backends import normalize_email
+from .reference import cached_colleges, cached_sports
+from .throttle import throttled_authenticate
 from django.db import IntegrityError
 
 CustomBaseUser = get_user_model()
 
+
+class CachedChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in self.field.loader():
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(self.field.loader()) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.loader())
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField that renders and validates against a cached list of instances
+    (see reference.py) instead of querying ``queryset`` on every request
+    """
+    iterator = CachedChoiceIterator
+
+    def __init__(self, loader, queryset, **kwargs):
+        self.loader = loader
+        super().__init__(queryset=queryset, **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        key = self.to_field_name or "pk"
+        if isinstance(value, self.queryset.model):
+            value = getattr(value, key)
+        for obj in self.loader():
+            if str(getattr(obj, key)) == str(value):
+                return obj
+        raise forms.ValidationError(
+            self.error_messages["invalid_choice"], code="invalid_choice", params={"value": value}
+        )
+
+
 class UserRegistrationForm(forms.Form):
     name = forms.CharField(max_length=100, required=True, label="Full Name")
     email = forms.EmailField(required=True)
@@ -14,7 +58,7 @@ class UserRegistrationForm(forms.Form):
     password2 = forms.CharField(widget=forms.PasswordInput, required=True, label="Confirm Password")
 
     def clean_email(self):
-        email = self.cleaned_data['email'].lower().strip()
+        email = normalize_email(self.cleaned_data['email'])
         if CustomBaseUser.objects.filter(username=email).exists():
             raise forms.ValidationError("An account with this email already exists.")
         return email
@@ -39,6 +83,7 @@ class UserRegistrationForm(forms.Form):
             )
             UserProfile.objects.create(
                 auth_user=user,
+                email=email,
                 name=self.cleaned_data["name"],
                 phone_number=self.cleaned_data["phone_number"],
                 gender=self.cleaned_data["gender"]
@@ -55,9 +100,10 @@ CustomBaseUser = get_user_model()
 
 class PlayerRegistrationForm(forms.ModelForm):
     # Fields that aren’t in CustomBaseUser but needed for Player
-    college = forms.ModelChoiceField(queryset=College.objects.all(), required=True)
+    college = CachedModelChoiceField(cached_colleges, queryset=College.objects.all(), required=True)
     is_coach = forms.BooleanField(required=False, label="Register as Coach?")
-    sports_if_coach = forms.ModelChoiceField(
+    sports_if_coach = CachedModelChoiceField(
+        cached_sports,
         queryset=Sport.objects.all(),
         required=False,
         label="Sport (required if coach)"
@@ -120,48 +166,57 @@ class PlayerLoginForm(forms.Form):
     email = forms.EmailField(label="Email", required=True)
     password = forms.CharField(widget=forms.PasswordInput, label="Password", required=True)
 
+    def __init__(self, *args, **kwargs):
+        self.request = kwargs.pop("request", None)
+        super().__init__(*args, **kwargs)
+
     def clean(self):
         cleaned_data = super().clean()
         email = cleaned_data.get("email")
         password = cleaned_data.get("password")
 
         if email and password:
-            UserModel = get_user_model()
-            try:
-                user = UserModel.objects.get(email=email)
-            except UserModel.DoesNotExist:
-                raise forms.ValidationError("Invalid email or password.")
-
-            if not user.check_password(password):
+            # The only password check of the login (none at all once the client or the
+            # account is throttled); the view hands the user to login()
+            user = throttled_authenticate(self.request, normalize_email(email), email=email, password=password)
+            if user is None:
                 raise forms.ValidationError("Invalid email or password.")
+            # Ensure that the user is a player not an admin
+            if user.user_type != "player":
+                raise forms.ValidationError("You are not authorized to login as a Player.")
 
             cleaned_data["user"] = user
         return cleaned_data
 
 class SportsRegistrationForm(forms.Form):
-    sport = forms.ModelChoiceField(queryset=Sport.objects.all(), required=True, label="Select Sport")
+    sport = CachedModelChoiceField(cached_sports, queryset=Sport.objects.all(), required=True, label="Select Sport")
 
 class AdminLoginForm(forms.Form):
     username = forms.CharField(label="Admin Username", required=True)
     password = forms.CharField(widget=forms.PasswordInput, label="Password", required=True)
 
+    def __init__(self, *args, **kwargs):
+        self.request = kwargs.pop("request", None)
+        super().__init__(*args, **kwargs)
+
     def clean(self):
         cleaned = super().clean()
         username = cleaned.get("username")
         password = cleaned.get("password")
 
         if username and password:
-            User = get_user_model()
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
+            # ModelBackend checks the password and rejects inactive accounts
+            user = throttled_authenticate(self.request, username, username=username, password=password)
+            if user is None:
                 raise forms.ValidationError("Invalid username or password.")
 
-            if not user.is_active:
-                raise forms.ValidationError("This account is inactive.")
-
             if not user.user_type == "admin":
                 raise forms.ValidationError("You do not have admin access.")
 
             cleaned["user"] = user
-        return cleaned
\ No newline at end of file
+        return cleaned
+
+
+class RosterImportForm(forms.Form):
+    kind = forms.ChoiceField(choices=[("players", "Players"), ("colleges", "Colleges")], label="Import")
+    file = forms.FileField(label="CSV file")
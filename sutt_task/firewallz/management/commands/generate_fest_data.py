@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from firewallz.fest_data import generate_fest_data
+
+
+class Command(BaseCommand):
+    help = "Generates a synthetic fest-scale data set (colleges, players, teams, payments) for benchmarking"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--colleges", type=int, default=200)
+        parser.add_argument("--players-per-college", type=int, default=50)
+        parser.add_argument("--sports", type=int, default=20, help="How many of SPORTS_NAMES to use")
+        parser.add_argument("--teams-per-college", type=int, default=8)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--tag", default=None, help="Prefix for generated names, to run the command more than once")
+
+    def handle(self, *args, **options):
+        totals = generate_fest_data(
+            colleges=options["colleges"],
+            players_per_college=options["players_per_college"],
+            sports=options["sports"],
+            teams_per_college=options["teams_per_college"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+            tag=options["tag"],
+            stdout=self.stdout,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {totals['colleges']} colleges, {totals['players']} players, "
+            f"{totals['teams']} teams, {totals['team_players']} team players, "
+            f"{totals['events']} event registrations and {totals['transactions']} transactions "
+            f"(tag {totals['tag']})."
+        ))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from firewallz.provisioning import write_activation_links
+from firewallz.roster_import import IMPORT_BATCH_SIZE, import_colleges, import_players
+
+IMPORTERS = {"colleges": import_colleges, "players": import_players}
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk imports colleges (name, letter_code, address, city, state) or pre-registered "
+        "players (name, email, phone_number, gender, college, is_coach) from a CSV file"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path", help="CSV file with a header row")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--errors", help="Write the rejected rows as CSV to this file")
+        parser.add_argument("--tokens", help="Write the imported players' activation links as CSV to this file")
+        parser.add_argument(
+            "--base-url", default="", help="Site URL to prefix activation links with, e.g. https://example.com"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as f:
+                report = IMPORTERS[options["kind"]](f, batch_size=options["batch_size"])
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for line, message in report.errors:
+            self.stderr.write(f"line {line}: {message}")
+        if options["errors"]:
+            with open(options["errors"], "w", newline="") as f:
+                report.write_errors(f)
+        if options["tokens"]:
+            with open(options["tokens"], "w", newline="") as f:
+                write_activation_links(f, report.activations, options["base_url"])
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Imported {report.created} {options['kind']}, rejected {len(report.errors)} rows."
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from firewallz.provisioning import issue_activation_tokens, provisioned_profiles, write_activation_links
+
+
+class Command(BaseCommand):
+    help = (
+        "Issues fresh one-time activation links for provisioned accounts that have no password "
+        "yet, replacing any earlier links, and writes them as CSV"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="CSV file to write email,activation_link rows to")
+        parser.add_argument("--college", help="Only players of the college with this letter code")
+        parser.add_argument("--email", nargs="*", help="Only these accounts")
+        parser.add_argument(
+            "--base-url", default="", help="Site URL to prefix activation links with, e.g. https://example.com"
+        )
+
+    def handle(self, *args, **options):
+        profiles = provisioned_profiles()
+        if options["college"]:
+            profiles = profiles.filter(auth_user__player__college__letter_code__iexact=options["college"])
+        if options["email"]:
+            profiles = profiles.filter(email__in=[email.lower() for email in options["email"]])
+        links = issue_activation_tokens(list(profiles))
+        with open(options["output"], "w", newline="") as f:
+            write_activation_links(f, links, options["base_url"])
+        self.stdout.write(self.style.SUCCESS(f"Issued {len(links)} activation links."))
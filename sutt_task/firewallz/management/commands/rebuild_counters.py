@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from firewallz.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the registration counters table from the Player, TeamPlayer and Group tables"
+
+    def handle(self, *args, **options):
+        total = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} registration counters."))
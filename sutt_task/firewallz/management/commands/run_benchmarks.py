@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from firewallz.benchmarks import (
+    compare_reports, format_comparison, load_report, run_benchmarks, save_report,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests every firewallz view and reports p50/p95 latency and query counts, optionally "
+        "against a baseline (which may come from another DATABASE_URL backend)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--only", nargs="*", help="URL names to benchmark (default: all)")
+        parser.add_argument("--player", help="Email of the player to request the player pages as")
+        parser.add_argument(
+            "--admin", help="Username of the admin to request the admin pages as (default: a temporary admin)",
+        )
+        parser.add_argument("--output", help="Write the report as JSON to this file")
+        parser.add_argument("--compare", help="Baseline JSON report to compare against")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2,
+            help="Allowed p95 slowdown against the baseline, as a fraction",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = run_benchmarks(
+                iterations=options["iterations"], only=options["only"], player_email=options["player"],
+                admin_username=options["admin"], stdout=self.stdout,
+            )
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No admin with username {options['admin']!r}")
+        if report["skipped"]:
+            self.stdout.write(f"Skipped (no data to fill the URL): {', '.join(report['skipped'])}")
+        if options["output"]:
+            save_report(report, options["output"])
+            self.stdout.write(f"Report written to {options['output']}")
+        if options["compare"]:
+            baseline = load_report(options["compare"])
+            for line in format_comparison(baseline, report):
+                self.stdout.write(line)
+            regressions = compare_reports(baseline, report, options["threshold"])
+            if regressions:
+                raise CommandError("Regressions against baseline:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
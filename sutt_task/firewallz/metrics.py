@@ -0,0 +1,140 @@
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+_current = ContextVar("firewallz_request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Query count, SQL time and template render time accumulated over one request
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - start
+
+
+class ViewHistogram:
+    """
+    Rolling window of the most recent samples per URL name, shared by every request
+    served by this process
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, url_name, wall, queries, sql_time, template_time):
+        with self._lock:
+            self._samples[url_name].append((wall, queries, sql_time, template_time))
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        with self._lock:
+            samples = {name: list(rows) for name, rows in self._samples.items()}
+        rows = []
+        for url_name, values in sorted(samples.items()):
+            walls = sorted(v[0] for v in values)
+            queries = [v[1] for v in values]
+            rows.append({
+                "url_name": url_name,
+                "requests": len(values),
+                "p50_ms": percentile(walls, 50) * 1000,
+                "p95_ms": percentile(walls, 95) * 1000,
+                "avg_queries": statistics.fmean(queries),
+                "max_queries": max(queries),
+                "avg_sql_ms": statistics.fmean(v[2] for v in values) * 1000,
+                "avg_template_ms": statistics.fmean(v[3] for v in values) * 1000,
+            })
+        return rows
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = round(pct / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+histogram = ViewHistogram(settings.REQUEST_METRICS_WINDOW)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records per-request query count, SQL time, template render time and wall time,
+    tagged by URL name. The numbers are sent back in a Server-Timing header and kept
+    in the in-process histogram shown on the admin metrics page.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.sql_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        wall = time.perf_counter() - start
+
+        match = getattr(request, "resolver_match", None)
+        url_name = (match.url_name if match else None) or "unresolved"
+        histogram.record(url_name, wall, metrics.queries, metrics.sql_time, metrics.template_time)
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={metrics.sql_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f"tpl;dur={metrics.template_time * 1000:.1f}",
+            f"total;dur={wall * 1000:.1f}",
+        ])
+        return response
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    DjangoTemplates backend whose templates add their render time to the current
+    request's metrics. Only top-level renders are timed, so includes are not counted twice.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:01
+
+import uuid
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def counter_key(scope, *ids):
+    # Frozen copy of RegistrationCounter.make_key as of this migration
+    return ":".join([scope, *(str(i) for i in ids)])
+
+
+def populate_counters(apps, schema_editor):
+    """
+    Counts the existing registrations, as firewallz.counters.rebuild_counters did when
+    this migration was written, using the historical models only
+    """
+    Player = apps.get_model("firewallz", "Player")
+    TeamPlayer = apps.get_model("firewallz", "TeamPlayer")
+    Group = apps.get_model("firewallz", "Group")
+    RegistrationCounter = apps.get_model("firewallz", "RegistrationCounter")
+    db = schema_editor.connection.alias
+
+    counts = {}
+    players = (
+        Player._base_manager.using(db).filter(is_deleted=False, is_coach=False)
+        .values("college_id").annotate(n=Count("pk"))
+    )
+    for row in players:
+        counts[("college", row["college_id"])] = row["n"]
+    team_players = (
+        TeamPlayer._base_manager.using(db).filter(is_deleted=False)
+        .values("team__college_id", "team__sport_id").annotate(n=Count("pk"))
+    )
+    for row in team_players:
+        counts[("sport", row["team__college_id"], row["team__sport_id"])] = row["n"]
+    event_rows = (
+        TeamPlayer.events.through._base_manager.using(db).filter(teamplayer__is_deleted=False)
+        .values("teamplayer__player__college_id", "event_id").annotate(n=Count("teamplayer_id", distinct=True))
+    )
+    for row in event_rows:
+        counts[("event", row["teamplayer__player__college_id"], row["event_id"])] = row["n"]
+    for row in Group.players.through._base_manager.using(db).values("group_id").annotate(n=Count("pk")):
+        counts[("group", row["group_id"])] = row["n"]
+
+    RegistrationCounter._base_manager.using(db).bulk_create(
+        [RegistrationCounter(scope=key[0], key=counter_key(*key), count=count) for key, count in counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firewallz', '0003_team_is_verified_by_firewallz'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationCounter',
+            fields=[
+                ('static_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('scope', models.CharField(choices=[('college', 'Players per college'), ('sport', 'Team players per college and sport'), ('event', 'Team players per college and event'), ('group', 'Players per group')], max_length=10)),
+                ('key', models.CharField(max_length=100, unique=True)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Registration Counter',
+                'verbose_name_plural': 'Registration Counters',
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
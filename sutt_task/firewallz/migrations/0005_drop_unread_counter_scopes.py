@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+def delete_unread_counters(apps, schema_editor):
+    RegistrationCounter = apps.get_model("firewallz", "RegistrationCounter")
+    db = schema_editor.connection.alias
+    RegistrationCounter._base_manager.using(db).filter(scope__in=["college", "sport"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('firewallz', '0004_registrationcounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_unread_counters, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='registrationcounter',
+            name='scope',
+            field=models.CharField(choices=[('event', 'Team players per college and event'), ('group', 'Players per group')], max_length=10),
+        ),
+    ]
@@ -43,6 +43,8 @@ SPORTS_NAMES = [
     ("TAEKWONDO", "TAWKWONDO"),
 ]
 
+MAX_EVENTS_PER_PLAYER = 5
+
 ARRIVAL_ROUTE_CHOICES = [
     ("LHU -> PLI", "LHU -> PLI"),
     ("IGI -> PLI", "IGI -> PLI"),
@@ -373,9 +375,21 @@ class Player(models.Model):
             models.Index(fields=["is_deleted"]),
         ]
 
+    # The fields __str__ shows, which the cached college list renders for representatives
+    DISPLAY_FIELDS = ("name", "email", "college_id")
+
     def __str__(self):
         return f"{self.name} - {self.email} ({self.college.name})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_display = instance.display_values()
+        return instance
+
+    def display_values(self):
+        return tuple(self.__dict__.get(field) for field in self.DISPLAY_FIELDS)
+
     @property
     def is_college_rep(self):
         return self.college.representative == self if self.college else False
@@ -391,11 +405,18 @@ class Player(models.Model):
             raise ValidationError(
                 "Cannot be verified by controls without being verified by firewallz"
             )
-        count = 0
-        for team_player in TeamPlayer.objects.filter(player=self):
-            count += team_player.events.all().count()  # TODO: OPTIMIZE
-        if count > 5:
-            raise ValidationError("Cannot register for more than 5 events.")
+        # A player being created cannot have any TeamPlayers yet
+        if not self._state.adding and self.registered_events_count() > MAX_EVENTS_PER_PLAYER:
+            raise ValidationError(f"Cannot register for more than {MAX_EVENTS_PER_PLAYER} events.")
+
+    def registered_events_count(self):
+        """
+        Number of events the player is registered for across all of their teams,
+        counted with a single aggregate over the TeamPlayer-Event through table
+        """
+        return TeamPlayer.events.through.objects.filter(
+            teamplayer__player_id=self.pk, teamplayer__is_deleted=False
+        ).count()
 
     def save(self, *args, **kwargs):
         self.full_clean()
@@ -603,9 +624,8 @@ class TeamPlayer(models.Model):
                 "Selected Team's College does not match Player's College"
             )
 
-        team_players = TeamPlayer.objects.filter(player=self.player).values_list("events__static_id", flat=True)
-        if len(team_players) > 5:
-            raise ValidationError("Cannot register for more than 5 events.")
+        if self.player.registered_events_count() > MAX_EVENTS_PER_PLAYER:
+            raise ValidationError(f"Cannot register for more than {MAX_EVENTS_PER_PLAYER} events.")
         
         if self.status == "pcr_approved" and not self.is_playing:
             raise ValidationError("Cannot approve a player who is not playing in the team.")
@@ -617,7 +637,16 @@ class TeamPlayer(models.Model):
         return super().save(*args, **kwargs)
 
     def soft_delete(self, using=None, keep_parents=False):
+        # Imported here because counters and stats import this module
+        from .counters import adjust_event_counters, event_links
+        from .stats import invalidate_dashboard_stats
+
+        links = event_links(teamplayer_id=self.pk)
         type(self).all_objects.filter(pk=self.pk).update(is_deleted=True)
+        # update() sends no post_save, so keep the registration counters and the
+        # dashboard stats in step here
+        adjust_event_counters(links, -1)
+        invalidate_dashboard_stats()
 
 BASE_PAYMENT_AMOUNT = 1300
 SPORT_PAYMENT_AMOUNT = 200
@@ -816,7 +845,7 @@ class Group(models.Model):
             raise ValidationError("Group is locked.")
         if player.college_id != self.college_id:
             raise ValidationError("Player's college does not match group college.")
-        if self.max_size and self.players.count() >= self.max_size:
+        if self.max_size and RegistrationCounter.value("group", self.pk) >= self.max_size:
             raise ValidationError("Group is full.")
         self.players.add(player)
 
@@ -832,4 +861,46 @@ class Group(models.Model):
 
     def __str__(self):
         # Human-readable representation: name plus context about its purpose.
-        return f"{self.name} (Approval Group)"
\ No newline at end of file
+        return f"{self.name} (Approval Group)"
+
+
+COUNTER_SCOPE_CHOICES = [
+    ("event", "Team players per college and event"),
+    ("group", "Players per group"),
+]
+
+
+class RegistrationCounter(models.Model):
+    """
+    Denormalized registration count for one (scope, ids) key, kept up to date by the
+    signals in firewallz.signals so hot paths can read a single indexed row
+    instead of counting TeamPlayers and their events.
+    Rebuild from scratch with `manage.py rebuild_counters`.
+    """
+
+    static_id = models.UUIDField(
+        primary_key=True, default=uuid.uuid4, editable=False, max_length=36
+    )
+    scope = models.CharField(choices=COUNTER_SCOPE_CHOICES, max_length=10)
+    key = models.CharField(max_length=100, unique=True)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Registration Counter"
+        verbose_name_plural = "Registration Counters"
+
+    def __str__(self):
+        return f"{self.key} = {self.count}"
+
+    @staticmethod
+    def make_key(scope, *ids):
+        return ":".join([scope, *(str(i) for i in ids)])
+
+    @classmethod
+    def value(cls, scope, *ids):
+        return (
+            cls.objects.filter(key=cls.make_key(scope, *ids))
+            .values_list("count", flat=True)
+            .first()
+        ) or 0
@@ -0,0 +1,131 @@
+import base64
+import json
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class KeysetPage:
+    """
+    One page of a keyset (cursor) paginated queryset
+    """
+
+    def __init__(self, items, sort, next_cursor):
+        self.items = items
+        self.sort = sort
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(value, pk):
+    raw = json.dumps([str(value), str(pk)]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    return value, pk
+
+
+def get_page_size(request):
+    try:
+        page_size = int(request.GET.get("page_size", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def keyset_params(request, queryset, sort_fields, default_sort):
+    """
+    The validated (sort, cursor, page_size) of a keyset paginated request. An unknown
+    sort falls back to ``default_sort`` and a malformed cursor to None, the first page.
+    """
+    sort = request.GET.get("sort", default_sort)
+    if sort.lstrip("-") not in sort_fields:
+        sort = default_sort
+    cursor = decode_cursor(request.GET.get("cursor", ""))
+    if cursor:
+        field = queryset.model._meta.get_field(sort.lstrip("-"))
+        try:
+            cursor = field.to_python(cursor[0]), queryset.model._meta.pk.to_python(cursor[1])
+        except ValidationError:
+            cursor = None
+        if cursor and None in cursor:
+            cursor = None
+    return sort, cursor, get_page_size(request)
+
+
+def keyset_page(queryset, sort, cursor, page_size):
+    """
+    The page of ``queryset`` ordered on ``sort`` that starts just past ``cursor``
+    """
+    field_name = sort.lstrip("-")
+    descending = sort.startswith("-")
+    lookup = "lt" if descending else "gt"
+    pk_name = queryset.model._meta.pk.name
+
+    queryset = queryset.order_by(sort, f"-{pk_name}" if descending else pk_name)
+    if cursor:
+        value, pk = cursor
+        queryset = queryset.filter(
+            Q(**{f"{field_name}__{lookup}": value})
+            | Q(**{field_name: value, f"{pk_name}__{lookup}": pk})
+        )
+
+    items = list(queryset[: page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, field_name), last.pk)
+    return KeysetPage(items, sort, next_cursor)
+
+
+def keyset_paginate(request, queryset, sort_fields, default_sort):
+    """
+    Paginates ``queryset`` on (sort field, primary key) so every page costs a single
+    bounded query, no matter how deep into the listing the client is.
+
+    ``sort_fields`` lists the non-null, concrete fields of the model that the client
+    may sort on with ``?sort=<field>`` or ``?sort=-<field>``. The position is carried
+    in an opaque ``?cursor=`` value pointing just past the last row of the previous page.
+    """
+    return keyset_page(queryset, *keyset_params(request, queryset, sort_fields, default_sort))
+
+
+def sort_choices(sort_fields):
+    """
+    (value, label) pairs for a sort <select>, ascending and descending per field
+    """
+    choices = []
+    for field in sort_fields:
+        label = field.replace("_", " ").capitalize()
+        choices.append((field, f"{label} (asc)"))
+        choices.append((f"-{field}", f"{label} (desc)"))
+    return choices
+
+
+def uuid_param(request, name):
+    """
+    Returns the GET parameter ``name`` as a UUID, or None if it is missing or malformed
+    """
+    try:
+        return uuid.UUID(request.GET.get(name, ""))
+    except ValueError:
+        return None
@@ -0,0 +1,119 @@
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction as db_transaction
+from django.http import HttpResponse, HttpResponseRedirect
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import BasePayment, SportPayment, Transaction
+
+FINAL_STATUSES = ("SUCCESS", "FAILED", "TIMEOUT")
+
+
+class PaymentCallbackError(Exception):
+    pass
+
+
+class PaymentGateway(ABC):
+    """
+    Client for a payment provider. ``checkout_url`` runs inside the player's request, so
+    it must only build the redirect to the provider's hosted page and never wait on the
+    provider itself; the outcome arrives later at the ``payment_callback`` view.
+    """
+
+    @abstractmethod
+    def checkout_url(self, txn):
+        pass
+
+    @abstractmethod
+    def parse_callback(self, request):
+        """
+        Verifies a callback request and returns (reference_no, status, amount),
+        raising PaymentCallbackError if it cannot be trusted
+        """
+
+    def callback_response(self, txn):
+        return HttpResponse("OK", content_type="text/plain")
+
+
+class LocalGateway(PaymentGateway):
+    """
+    Stand-in provider for development and load tests. Its hosted page is the
+    ``local_gateway_checkout`` view, which hands the browser a signed outcome to post
+    to ``payment_callback``, the way redirect-based gateways report a payment.
+    """
+
+    salt = "firewallz.payments.local"
+
+    def checkout_url(self, txn):
+        return reverse("local_gateway_checkout", args=[txn.reference_no])
+
+    def sign(self, txn, status):
+        return signing.dumps(
+            {"reference_no": txn.reference_no, "status": status, "amount": txn.amount}, salt=self.salt
+        )
+
+    def parse_callback(self, request):
+        try:
+            payload = signing.loads(
+                request.POST.get("payload", ""), salt=self.salt, max_age=settings.PAYMENT_CALLBACK_MAX_AGE
+            )
+        except signing.BadSignature:
+            raise PaymentCallbackError("Bad callback signature")
+        return payload["reference_no"], payload["status"], payload["amount"]
+
+    def callback_response(self, txn):
+        # The browser carried the callback here, so send it on to the status page
+        return HttpResponseRedirect(reverse("payment_status", args=[txn.pk]))
+
+
+def get_gateway():
+    return import_string(settings.PAYMENT_GATEWAY)()
+
+
+def start_payment(txn):
+    """
+    Stores the provider's checkout URL on a freshly created PENDING transaction
+    """
+    txn.payment_url = get_gateway().checkout_url(txn)
+    txn.save(update_fields=["payment_url", "updated_at"])
+    return txn.payment_url
+
+
+def complete_payment(reference_no, status, amount):
+    """
+    Moves a PENDING transaction and the payments attached to it to ``status``. Providers
+    retry callbacks, so one for a transaction that is already settled changes nothing.
+    """
+    if status not in FINAL_STATUSES:
+        raise PaymentCallbackError(f"Unknown payment status {status!r}")
+    with db_transaction.atomic():
+        txn = Transaction.objects.select_for_update().filter(reference_no=reference_no).first()
+        if txn is None:
+            raise PaymentCallbackError(f"Unknown transaction {reference_no}")
+        if txn.status != "PENDING":
+            return txn
+        if amount != txn.amount:
+            raise PaymentCallbackError(f"Amount {amount} does not match transaction {reference_no}")
+        txn.status = status
+        txn.save()
+        for payment in [*BasePayment.objects.filter(transaction=txn), *SportPayment.objects.filter(transaction=txn)]:
+            payment.transaction_status = status
+            payment.save()
+    return txn
+
+
+def expire_stale_payment(txn):
+    """
+    Marks a PENDING transaction older than PAYMENT_CALLBACK_MAX_AGE as TIMEOUT, so a
+    lost or rejected callback does not keep the player from paying again. Returns the
+    transaction, settled by its callback instead if that won the race.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.PAYMENT_CALLBACK_MAX_AGE)
+    if txn.status != "PENDING" or txn.created_at > cutoff:
+        return txn
+    return complete_payment(txn.reference_no, "TIMEOUT", txn.amount)
@@ -0,0 +1,61 @@
+import csv
+import hashlib
+import secrets
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.urls import reverse
+
+from .models import UserProfile
+
+
+def new_activation_token():
+    """
+    Returns (token, digest). Only the digest is stored in UserProfile.reg_token, so a
+    leaked database does not hand out working activation links.
+    """
+    token = secrets.token_urlsafe(32)
+    return token, token_digest(token)
+
+
+def token_digest(token):
+    # A single SHA-256 is enough for a 256-bit random token and costs microseconds,
+    # unlike a password hasher
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def activation_path(profile_id, token):
+    return reverse("activate_account", args=[profile_id, token])
+
+
+def check_activation_token(profile, token):
+    return bool(profile.reg_token) and secrets.compare_digest(profile.reg_token, token_digest(token))
+
+
+def issue_activation_tokens(profiles, batch_size=1000):
+    """
+    Gives every profile a fresh one-time token (replacing any earlier one) and returns
+    [(email, activation path)]
+    """
+    links = []
+    for profile in profiles:
+        token, profile.reg_token = new_activation_token()
+        links.append((profile.email, activation_path(profile.pk, token)))
+    UserProfile.objects.bulk_update(profiles, ["reg_token"], batch_size=batch_size)
+    return links
+
+
+def write_activation_links(file, links, base_url=""):
+    writer = csv.writer(file)
+    writer.writerow(["email", "activation_link"])
+    writer.writerows((email, base_url.rstrip("/") + path) for email, path in links)
+
+
+def provisioned_profiles():
+    """
+    Profiles whose accounts still wait for their first password
+    """
+    return (
+        UserProfile.objects
+        .filter(auth_user__password__startswith=UNUSABLE_PASSWORD_PREFIX)
+        .select_related("auth_user")
+    )
@@ -0,0 +1,96 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import get_template
+
+from .models import College, Event, Sport
+
+REFERENCE_CACHE_PREFIX = "firewallz:reference"
+
+
+def version_key(kind):
+    return f"{REFERENCE_CACHE_PREFIX}:{kind}:version"
+
+
+def reference_version(kind):
+    """
+    Current cache version of one kind of reference data. A fresh version is taken from
+    the clock, so a version key lost to eviction never brings back an older snapshot.
+    """
+    version = cache.get(version_key(kind))
+    if version is None:
+        version = time.time_ns()
+        cache.add(version_key(kind), version, None)
+        version = cache.get(version_key(kind), version)
+    return version
+
+
+def _incr_version(kind):
+    try:
+        cache.incr(version_key(kind))
+    except ValueError:
+        cache.set(version_key(kind), time.time_ns(), None)
+
+
+def bump_reference_version(kind):
+    """
+    Moves ``kind`` to a new version now, and again once the surrounding transaction
+    commits, so a reader that cached the pre-commit rows in between is not kept around
+    """
+    _incr_version(kind)
+    transaction.on_commit(lambda: _incr_version(kind))
+
+
+def invalidate_reference_data():
+    for kind in ("colleges", "sports", "events"):
+        bump_reference_version(kind)
+
+
+def cached_reference(kind, loader, name=None):
+    """
+    Returns ``loader()`` from the cache under the current version of ``kind``.
+    ``name`` distinguishes several values derived from the same kind of data.
+    """
+    version = reference_version(kind)
+    key = f"{REFERENCE_CACHE_PREFIX}:{kind}:{name or 'all'}"
+    value = cache.get(key, version=version)
+    if value is None:
+        value = loader()
+        cache.set(key, value, settings.REFERENCE_DATA_CACHE_TTL, version=version)
+    return value
+
+
+def cached_colleges():
+    return cached_reference("colleges", lambda: list(College.objects.order_by("name")))
+
+
+def cached_sports():
+    return cached_reference("sports", lambda: list(Sport.objects.order_by("name", "gender")))
+
+
+def cached_events_by_sport():
+    """
+    {sport_id: [events]}, each list in primary key order
+    """
+    def load():
+        events = {}
+        for event in Event.objects.order_by("pk"):
+            events.setdefault(event.sport_id, []).append(event)
+        return events
+    return cached_reference("events", load)
+
+
+def fragment_version(template_name, rows, *related):
+    """
+    Digest of a template's source and of the primary key and updated_at of each row and
+    of its ``related`` objects, for keying a {% cache %} fragment on exactly the data it
+    renders. A deploy that changes the template changes every key.
+    """
+    digest = hashlib.sha256(get_template(template_name).template.source.encode())
+    for row in rows:
+        for obj in (row, *(getattr(row, name) for name in related)):
+            digest.update(f"{obj.pk}:{obj.updated_at.isoformat()};".encode() if obj else b"-;")
+    return digest.hexdigest()
@@ -0,0 +1,246 @@
+import csv
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .models import GENDER_CHOICES, College, Player, UserProfile
+from .provisioning import activation_path, new_activation_token
+from .reference import bump_reference_version
+from .stats import invalidate_dashboard_stats
+
+IMPORT_BATCH_SIZE = 1000
+COLLEGE_COLUMNS = ("name", "letter_code", "address", "city", "state")
+PLAYER_COLUMNS = ("name", "email", "phone_number", "gender", "college", "is_coach")
+REQUIRED_COLLEGE_COLUMNS = ("name", "address")
+REQUIRED_PLAYER_COLUMNS = ("name", "email", "phone_number", "gender", "college")
+TRUE_VALUES = ("1", "true", "yes", "y")
+FALSE_VALUES = ("", "0", "false", "no", "n")
+
+
+class ImportReport:
+    """
+    Outcome of one import: how many rows were created and why the others were not
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+        self.activations = []
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+    def write_errors(self, file):
+        writer = csv.writer(file)
+        writer.writerow(["line", "error"])
+        writer.writerows(self.errors)
+
+
+def read_batches(file, required, batch_size):
+    """
+    Streams a CSV file as lists of (line number, row) with every value stripped,
+    ``batch_size`` rows at a time
+    """
+    reader = csv.DictReader(file)
+    fields = [name.strip().lower() for name in reader.fieldnames or ()]
+    missing = [name for name in required if name not in fields]
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+    reader.fieldnames = fields
+    rows = (
+        (reader.line_num, {key: (value or "").strip() for key, value in row.items() if key in fields})
+        for row in reader
+    )
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def bulk_insert(report, batch, insert):
+    """
+    Runs ``insert`` for the valid rows of a batch in its own transaction, so a failure
+    costs that batch only. Returns whether the rows were inserted.
+    """
+    if not batch:
+        return False
+    try:
+        with transaction.atomic():
+            insert()
+    except IntegrityError as e:
+        # Another writer took one of the names or emails after the batch was validated
+        for line in batch:
+            report.error(line, f"Not imported, the batch conflicted with existing data: {e}")
+        return False
+    report.created += len(batch)
+    return True
+
+
+def import_colleges(file, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Creates colleges from a CSV with the COLLEGE_COLUMNS header. Names and letter codes
+    are checked against every existing college at once, held in memory.
+    """
+    report = ImportReport()
+    names = {name.lower() for name in College.all_objects.values_list("name", flat=True)}
+    codes = {
+        code.upper()
+        for code in College.all_objects.exclude(letter_code=None).values_list("letter_code", flat=True)
+    }
+    limits = {field: College._meta.get_field(field).max_length for field in COLLEGE_COLUMNS}
+
+    for batch in read_batches(file, REQUIRED_COLLEGE_COLUMNS, batch_size):
+        colleges, lines = [], []
+        for line, row in batch:
+            code = row.get("letter_code", "").upper() or None
+            errors = [f"{field} is required" for field in REQUIRED_COLLEGE_COLUMNS if not row[field]]
+            errors += [
+                f"{field} is longer than {limit} characters"
+                for field, limit in limits.items() if len(row.get(field, "")) > limit
+            ]
+            if row["name"].lower() in names:
+                errors.append(f"College {row['name']!r} already exists")
+            if code and code in codes:
+                errors.append(f"Letter code {code!r} is already taken")
+            if errors:
+                report.error(line, "; ".join(errors))
+                continue
+            names.add(row["name"].lower())
+            if code:
+                codes.add(code)
+            colleges.append(College(
+                name=row["name"], letter_code=code, address=row["address"],
+                city=row.get("city", ""), state=row.get("state", ""),
+            ))
+            lines.append(line)
+        bulk_insert(report, lines, lambda: College.objects.bulk_create(colleges))
+
+    if report.created:
+        # bulk_create sends no signals, so do what the College post_save handlers would
+        bump_reference_version("colleges")
+        invalidate_dashboard_stats()
+    return report
+
+
+def college_lookup():
+    """
+    {letter code or lower-cased name: college id} for every college
+    """
+    lookup = {}
+    for pk, name, code in College.objects.values_list("pk", "name", "letter_code"):
+        lookup[name.lower()] = pk
+        if code:
+            lookup[code.upper()] = pk
+    return lookup
+
+
+def player_limits():
+    """
+    {column: the smallest max_length of the User, UserProfile and Player fields it fills}
+    """
+    targets = {
+        "name": [(UserProfile, "name"), (Player, "name")],
+        "email": [(get_user_model(), "username"), (get_user_model(), "email"), (UserProfile, "email"), (Player, "email")],
+    }
+    limits = {}
+    for column, fields in targets.items():
+        lengths = [model._meta.get_field(field).max_length for model, field in fields]
+        limits[column] = min(length for length in lengths if length)
+    return limits
+
+
+def parse_player(row, colleges, limits):
+    """
+    Returns (fields, errors) for one CSV row, without touching the database
+    """
+    errors = [f"{field} is required" for field in REQUIRED_PLAYER_COLUMNS if not row[field]]
+    errors += [
+        f"{field} is longer than {limit} characters"
+        for field, limit in limits.items() if len(row[field]) > limit
+    ]
+    email = row["email"].lower()
+    if email:
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors.append(f"Invalid email {row['email']!r}")
+    phone = row["phone_number"].removeprefix("+91").replace(" ", "").replace("-", "")
+    if row["phone_number"] and not (phone.isdigit() and len(phone) == 10 and phone[0] != "0"):
+        errors.append(f"Phone number {row['phone_number']!r} is not 10 digits")
+    gender = row["gender"].capitalize()
+    if row["gender"] and gender not in dict(GENDER_CHOICES):
+        errors.append(f"Unknown gender {row['gender']!r}")
+    college_id = colleges.get(row["college"].upper()) or colleges.get(row["college"].lower())
+    if row["college"] and not college_id:
+        errors.append(f"Unknown college {row['college']!r}")
+    is_coach = row.get("is_coach", "").lower()
+    if is_coach not in TRUE_VALUES + FALSE_VALUES:
+        errors.append(f"is_coach must be yes or no, not {row['is_coach']!r}")
+    fields = {
+        "name": row["name"], "email": email, "phone_number": int(phone) if phone.isdigit() else None,
+        "gender": gender, "college_id": college_id, "is_coach": is_coach in TRUE_VALUES,
+    }
+    return fields, errors
+
+
+def import_players(file, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Pre-registers players from a CSV with the PLAYER_COLUMNS header, ``college`` being a
+    letter code or name. Each batch is validated together (one query per table for the
+    emails already taken) and inserted with bulk_create in its own transaction.
+
+    Nothing is hashed: accounts get an unusable password and a one-time activation token
+    (in ``report.activations``) with which the player sets a password on first login.
+    """
+    User = get_user_model()
+    report = ImportReport()
+    colleges = college_lookup()
+    limits = player_limits()
+    seen = set()
+
+    for batch in read_batches(file, REQUIRED_PLAYER_COLUMNS, batch_size):
+        parsed = [(line, *parse_player(row, colleges, limits)) for line, row in batch]
+        emails = [fields["email"] for _, fields, _ in parsed if fields["email"]]
+        taken = (
+            set(User.objects.filter(username__in=emails).values_list("username", flat=True))
+            | set(Player.all_objects.filter(email__in=emails).values_list("email", flat=True))
+            | set(UserProfile.objects.filter(email__in=emails).values_list("email", flat=True))
+        )
+        users, profiles, players, lines, links = [], [], [], [], []
+        for line, fields, errors in parsed:
+            if fields["email"] in taken:
+                errors.append(f"An account with email {fields['email']!r} already exists")
+            elif fields["email"] in seen:
+                errors.append(f"Email {fields['email']!r} appears earlier in the file")
+            if errors:
+                report.error(line, "; ".join(errors))
+                continue
+            seen.add(fields["email"])
+            user = User(
+                username=fields["email"], email=fields["email"], password=make_password(None), user_type="player"
+            )
+            users.append(user)
+            token, digest = new_activation_token()
+            profile = UserProfile(
+                auth_user=user, name=fields["name"], email=fields["email"],
+                phone_number=fields["phone_number"], gender=fields["gender"], reg_token=digest,
+            )
+            profiles.append(profile)
+            links.append((fields["email"], activation_path(profile.pk, token)))
+            players.append(Player(auth_user=user, status="pcr_confirmed", **fields))
+            lines.append(line)
+
+        def insert():
+            User.objects.bulk_create(users)
+            UserProfile.objects.bulk_create(profiles)
+            Player.objects.bulk_create(players)
+
+        if bulk_insert(report, lines, insert):
+            report.activations.extend(links)
+
+    # bulk_create sends no signals, so do what the Player post_save handlers would
+    if report.created:
+        invalidate_dashboard_stats()
+    return report
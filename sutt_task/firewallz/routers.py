@@ -0,0 +1,85 @@
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+REPLICA_ALIAS = "replica"
+PRIMARY_PIN_COOKIE = "firewallz_pin_primary"
+
+_use_replica = ContextVar("firewallz_use_replica", default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the replica alias while a view wrapped in ``read_from_replica`` is
+    running; everything else, and every write, goes to the primary. The first write in
+    a replica-routed request moves the rest of that request back onto the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and replica_configured():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        _use_replica.set(False)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        aliases = {"default", REPLICA_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+def pinned_to_primary(request):
+    """
+    True if this client wrote something recently enough that the replica may not have
+    caught up yet
+    """
+    try:
+        return float(request.COOKIES.get(PRIMARY_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_from_replica(view):
+    """
+    Runs a read-only reporting view against the replica. Non-GET requests and clients
+    pinned to the primary after a recent write keep reading from the primary.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or pinned_to_primary(request):
+            return view(request, *args, **kwargs)
+        token = _use_replica.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+class PinPrimaryAfterWriteMiddleware:
+    """
+    After any unsafe request (POST, PUT, ...), pins the client to the primary for
+    REPLICA_PIN_SECONDS through a cookie so it reads its own writes despite replica lag
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS", "TRACE") and replica_configured():
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, str(time.time() + seconds), max_age=seconds, httponly=True, samesite="Lax"
+            )
+        return response
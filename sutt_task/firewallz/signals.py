@@ -0,0 +1,106 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .counters import adjust_event_counters, adjust_group_counters, event_links
+from .models import College, Event, Group, Player, Sport, Team, TeamPlayer
+from .reference import bump_reference_version
+from .stats import invalidate_dashboard_stats
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+@receiver(post_save, sender=TeamPlayer)
+@receiver(post_delete, sender=TeamPlayer)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=College)
+@receiver(post_delete, sender=College)
+def invalidate_dashboard_stats_on_change(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+
+########################### REGISTRATION COUNTERS ##############################
+
+# Counters move by the number of links that changed; only rebuild_counters recounts.
+# Links about to go are read in the pre_* signals, while they still exist.
+
+@receiver(m2m_changed, sender=TeamPlayer.events.through)
+def adjust_event_counters_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    owner, other = ("event_id", "teamplayer_id") if reverse else ("teamplayer_id", "event_id")
+    if action in ("pre_remove", "pre_clear", "post_add"):
+        filters = {owner: instance.pk}
+        if pk_set is not None:
+            filters[f"{other}__in"] = pk_set
+        links = event_links(**filters)
+    if action in ("pre_remove", "pre_clear"):
+        instance._counter_event_links = links
+    elif action == "post_add":
+        adjust_event_counters(links, 1)
+    elif action in ("post_remove", "post_clear"):
+        adjust_event_counters(instance._counter_event_links, -1)
+
+
+@receiver(pre_delete, sender=TeamPlayer)
+def remember_events_before_delete(sender, instance, **kwargs):
+    # The through rows are gone by post_delete
+    instance._counter_event_links = event_links(teamplayer_id=instance.pk)
+
+
+@receiver(post_delete, sender=TeamPlayer)
+def adjust_event_counters_on_delete(sender, instance, **kwargs):
+    adjust_event_counters(getattr(instance, "_counter_event_links", []), -1)
+
+
+@receiver(m2m_changed, sender=Group.players.through)
+def adjust_group_counters_on_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("pre_remove", "pre_clear"):
+        memberships = Group.players.through._base_manager.filter(
+            **{"player_id" if reverse else "group_id": instance.pk}
+        )
+        if pk_set is not None:
+            memberships = memberships.filter(**{"group_id__in" if reverse else "player_id__in": pk_set})
+        instance._counter_group_ids = list(memberships.values_list("group_id", flat=True))
+    elif action == "post_add":
+        # pk_set holds only the newly added links
+        adjust_group_counters(pk_set if reverse else [instance.pk] * len(pk_set), 1)
+    elif action in ("post_remove", "post_clear"):
+        adjust_group_counters(instance._counter_group_ids, -1)
+
+
+############################## REFERENCE DATA ##################################
+
+@receiver(post_save, sender=College)
+@receiver(post_delete, sender=College)
+def invalidate_cached_colleges(sender, **kwargs):
+    bump_reference_version("colleges")
+
+
+@receiver(post_save, sender=Player)
+def invalidate_cached_colleges_on_representative_change(sender, instance, created, **kwargs):
+    # The cached college list shows each representative, so only a representative whose
+    # displayed fields changed matters; a new player cannot be one yet
+    display = instance.display_values()
+    changed = not created and getattr(instance, "_loaded_display", None) != display
+    instance._loaded_display = display
+    if changed and College.objects.filter(representative_id=instance.pk).exists():
+        bump_reference_version("colleges")
+
+
+@receiver(pre_delete, sender=Player)
+def invalidate_cached_colleges_on_representative_delete(sender, instance, **kwargs):
+    # SET_NULL clears College.representative with a queryset update, which sends no
+    # College post_save
+    if College.objects.filter(representative_id=instance.pk).exists():
+        bump_reference_version("colleges")
+
+
+@receiver(post_save, sender=Sport)
+@receiver(post_delete, sender=Sport)
+def invalidate_cached_sports(sender, **kwargs):
+    bump_reference_version("sports")
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_cached_events(sender, **kwargs):
+    bump_reference_version("events")
@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Q
+
+from .models import College, Player, Team, TeamPlayer
+
+DASHBOARD_STATS_CACHE_KEY = "firewallz:admin_dashboard_stats"
+
+
+def compute_dashboard_stats():
+    """
+    Computes the admin dashboard counters with one aggregate query per table. They are
+    read from the primary even in a replica-routed view, since they end up cached for
+    everyone: a lagging replica would cache counts the last write has just invalidated.
+    """
+    # TeamPlayer now only holds players (not coaches)
+    team_player_stats = TeamPlayer.objects.using(DEFAULT_DB_ALIAS).aggregate(
+        pcr_approved_players=Count('static_id', filter=Q(player__status='pcr_confirmed')),
+        firewallz_approved_players=Count('static_id', filter=Q(player__verified_by_firewallz=True)),
+    )
+    player_stats = Player.objects.using(DEFAULT_DB_ALIAS).aggregate(
+        total_players=Count('static_id', filter=Q(is_coach=False)),
+        total_coaches=Count('static_id', filter=Q(is_coach=True)),
+        pcr_approved_coaches=Count('static_id', filter=Q(is_coach=True, status='pcr_confirmed')),
+        firewallz_approved_coaches=Count('static_id', filter=Q(is_coach=True, verified_by_firewallz=True)),
+    )
+    # Counted on their own: joining teams through colleges would drop those of deleted colleges
+    return {
+        **team_player_stats,
+        **player_stats,
+        'total_teams': Team.objects.using(DEFAULT_DB_ALIAS).count(),
+        'total_colleges': College.objects.using(DEFAULT_DB_ALIAS).count(),
+    }
+
+
+def get_dashboard_stats():
+    """
+    Returns the dashboard counters from the cache, recomputing them on a miss
+    """
+    stats = cache.get(DASHBOARD_STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_dashboard_stats()
+        cache.set(DASHBOARD_STATS_CACHE_KEY, stats, settings.DASHBOARD_STATS_CACHE_TTL)
+    return stats
+
+
+def invalidate_dashboard_stats():
+    """
+    Drops the cached counters now, and again once the surrounding transaction commits,
+    so counts read before the commit are not kept around
+    """
+    cache.delete(DASHBOARD_STATS_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(DASHBOARD_STATS_CACHE_KEY))
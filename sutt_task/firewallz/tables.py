@@ -4,6 +4,29 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import SportPayment
 
+def with_payment_ids(rows):
+    """
+    Fills in ``payment_id`` for rows that carry neither a precomputed ``payment_id``
+    nor an ``is_paid`` flag, using a single lookup of successful SportPayments keyed by
+    team_player_id
+    """
+    rows = list(rows)
+    missing = {
+        row["team_player"].pk
+        for row in rows
+        if "payment_id" not in row and "is_paid" not in row
+    }
+    if missing:
+        payment_ids = dict(
+            SportPayment.objects
+            .filter(team_player_id__in=missing, transaction_status="SUCCESS")
+            .values_list("team_player_id", "static_id")
+        )
+        for row in rows:
+            row.setdefault("payment_id", payment_ids.get(row["team_player"].pk))
+    return rows
+
+
 class TeamPlayerTable(tables.Table):
     sport = tables.Column(accessor="event.sport.name", verbose_name="Sport")
     category = tables.Column(accessor="event.sport.gender", verbose_name="Category")
@@ -12,6 +35,9 @@ class TeamPlayerTable(tables.Table):
     status = tables.Column(accessor="team_player.status", verbose_name="Status")
     payment = tables.Column(empty_values=(), verbose_name="Payment Status", orderable=False)
 
+    def __init__(self, data=None, *args, **kwargs):
+        super().__init__(with_payment_ids(data or []), *args, **kwargs)
+
     def render_payment(self, record: TeamPlayer):
 
         team_player = record.get("team_player")
@@ -19,15 +45,8 @@ class TeamPlayerTable(tables.Table):
         if not team_player_id:
             return ""
 
-        # Try to find an existing payment for this team player
-        payment_id = (
-            SportPayment.objects
-            .filter(team_player_id=team_player_id)
-            .values_list("static_id", flat=True)
-            .first()
-        )
-
-        if payment_id:
+        # Rows carry either an annotated paid flag or a bulk-looked-up payment id
+        if record.get("is_paid") or record.get("payment_id"):
             url = reverse("print_receipt", args=[team_player_id])
             return mark_safe(
                 f'<a class="btn btn-sm btn-outline-secondary" href="{url}" target="_blank">Print Receipt</a>'
@@ -1,3 +1,1243 @@
-from django.test import TestCase
+import csv
+import re
+import tempfile
+import threading
+import uuid
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, router
+from django.db.models import Count
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from sutt_task.database import database_from_url
+
+from .benchmarks import SKIPPED_ROUTES, compare_reports, run_benchmarks
+from .exports import PAYMENT_HEADER
+from .fest_data import generate_fest_data
+from .forms import SportsRegistrationForm
+from .payments import PaymentGateway
+from .reference import cached_colleges
+from .roster_import import import_players
+from .metrics import histogram
+from .routers import PRIMARY_PIN_COOKIE, read_from_replica
+from . import urls
+from .stats import DASHBOARD_STATS_CACHE_KEY, get_dashboard_stats
+from .tables import TeamPlayerTable
+from .throttle import client_ip, short_circuit_counts
+from .models import (
+    SPORT_PAYMENT_AMOUNT, BasePayment, College, Event, Group, Player, RegistrationCounter, Sport, SportPayment,
+    Team, TeamPlayer, Transaction, UserProfile,
+)
+
+
+def make_user(username, user_type="player"):
+    return get_user_model().objects.create_user(
+        username=username, email=username, password="pass12345", user_type=user_type
+    )
+
+
+def make_college(name="Test College", letter_code="TC", address="Somewhere"):
+    return College.objects.create(name=name, letter_code=letter_code, address=address)
+
+
+def make_player(college, email, **kwargs):
+    defaults = {
+        "name": email.split("@")[0],
+        "phone_number": 9999999999,
+        "gender": "Male",
+        "status": "pcr_confirmed",
+    }
+    defaults.update(kwargs)
+    return Player.objects.create(
+        auth_user=make_user(email), email=email, college=college, **defaults
+    )
+
+
+def enroll(player, sport_name, **kwargs):
+    sport, _ = Sport.objects.get_or_create(name=sport_name, gender="Male", defaults={"max_players": 10})
+    team, _ = Team.objects.get_or_create(college=player.college, sport=sport)
+    kwargs.setdefault("status", "pcr_approved")
+    return TeamPlayer.objects.create(player=player, team=team, is_playing=True, **kwargs)
+
+
+class CollegeTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.college = make_college()
+
+
+class PlayerTestCase(CollegeTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.player = make_player(cls.college, "player@example.com")
+
+
+class PlayerDashboardQueryTests(PlayerTestCase):
+    def setUp(self):
+        self.client.force_login(self.player.auth_user)
+
+    def add_team_player(self, sport_name, paid=False):
+        sport = Sport.objects.create(name=sport_name, gender="Male", max_players=10)
+        event = Event.objects.create(sport=sport, name=f"{sport_name} singles")
+        team = Team.objects.create(college=self.college, sport=sport)
+        team_player = TeamPlayer.objects.create(
+            player=self.player, team=team, is_playing=True, status="pcr_approved"
+        )
+        team_player.events.add(event)
+        if paid:
+            transaction = Transaction.objects.create(
+                paid_by=self.player, paid_for=self.player, reference_no=sport_name,
+                type="PLAYER", status="SUCCESS",
+            )
+            SportPayment.objects.create(
+                team_player=team_player, transaction=transaction, transaction_status="SUCCESS"
+            )
+        return team_player
+
+    def get_dashboard(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("player_dashboard"))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_is_constant_in_number_of_events(self):
+        self.add_team_player("CHESS", paid=True)
+        _, baseline = self.get_dashboard()
+        for name in ("CARROM", "SQUASH", "TENNIS"):
+            self.add_team_player(name)
+        response, queries = self.get_dashboard()
+        self.assertEqual(queries, baseline)
+        self.assertEqual(len(response.context["rows"]), 4)
+
+    def test_paid_status_is_annotated_per_team_player(self):
+        paid = self.add_team_player("CHESS", paid=True)
+        self.add_team_player("CARROM")
+        response, _ = self.get_dashboard()
+        statuses = {row["team_player_id"]: row["is_paid"] for row in response.context["rows"]}
+        self.assertTrue(statuses.pop(paid.pk))
+        self.assertEqual(list(statuses.values()), [False])
+
+
+class PcrApprovedPlayersTests(CollegeTestCase):
+    def setUp(self):
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+
+    def get_page(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("pcr_approved_players"))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_each_player_is_listed_once(self):
+        player = make_player(self.college, "one@example.com")
+        first = enroll(player, "CHESS")
+        enroll(player, "CARROM")
+        enroll(make_player(self.college, "two@example.com"), "CHESS")
+        response, _ = self.get_page()
+        rows = response.context["team_players"]
+        self.assertEqual(len(rows), 2)
+        self.assertIn(first, rows)
+
+    def test_query_count_is_constant_in_number_of_players(self):
+        enroll(make_player(self.college, "one@example.com"), "CHESS")
+        _, baseline = self.get_page()
+        for i in range(5):
+            enroll(make_player(self.college, f"extra{i}@example.com"), "CARROM")
+        _, queries = self.get_page()
+        self.assertEqual(queries, baseline)
+
+
+class FirewallzApprovedPlayersTests(CollegeTestCase):
+    def setUp(self):
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+
+    def approved_player(self, email, *sports):
+        player = make_player(self.college, email, verified_by_firewallz=True)
+        for sport_name in sports:
+            enroll(player, sport_name)
+        return player
+
+    def get_page(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("firewallz_approved_players"))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_lists_sports_of_each_player(self):
+        self.approved_player("one@example.com", "CHESS", "CARROM")
+        response, _ = self.get_page()
+        self.assertContains(response, "CHESS-Male")
+        self.assertContains(response, "CARROM-Male")
+
+    def test_query_count_is_constant_in_number_of_players(self):
+        self.approved_player("one@example.com", "CHESS")
+        _, baseline = self.get_page()
+        for i in range(5):
+            self.approved_player(f"extra{i}@example.com", "CARROM", "SQUASH")
+        _, queries = self.get_page()
+        self.assertEqual(queries, baseline)
+
+
+class EventLimitValidationTests(PlayerTestCase):
+    def register_events(self, sport_name, count):
+        team_player = enroll(self.player, sport_name)
+        sport = team_player.team.sport
+        team_player.events.add(*[
+            Event.objects.create(sport=sport, name=f"{sport_name} {i}") for i in range(count)
+        ])
+        return team_player
+
+    def test_registered_events_count_spans_teams(self):
+        self.register_events("CHESS", 2)
+        self.register_events("CARROM", 3)
+        self.assertEqual(self.player.registered_events_count(), 5)
+
+    def test_player_save_rejects_more_than_five_events(self):
+        self.register_events("CHESS", 3)
+        self.register_events("CARROM", 3)
+        with self.assertRaises(ValidationError):
+            self.player.save()
+
+    def test_player_save_cost_does_not_grow_with_teams(self):
+        self.register_events("CHESS", 1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.player.save()
+        baseline = len(ctx.captured_queries)
+        self.register_events("CARROM", 1)
+        self.register_events("SQUASH", 1)
+        with CaptureQueriesContext(connection) as ctx:
+            self.player.save()
+        self.assertEqual(len(ctx.captured_queries), baseline)
+
+
+class TeamApprovalTests(CollegeTestCase):
+    def setUp(self):
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+
+    def team_with_members(self, sport_name, count, verified=True):
+        team_player = None
+        for i in range(count):
+            player = make_player(
+                self.college, f"{sport_name.lower()}{i}@example.com", verified_by_firewallz=verified
+            )
+            team_player = enroll(player, sport_name)
+        return team_player.team
+
+    def test_players_cannot_approve_teams(self):
+        team = self.team_with_members("CHESS", 1)
+        self.client.force_login(team.team_players.first().player.auth_user)
+        for response in (
+            self.client.post(reverse("approve_teams"), {"college_id": self.college.pk}),
+            self.client.post(reverse("approve_team", args=[team.pk])),
+        ):
+            self.assertRedirects(response, "/firewallz/admin/login/", fetch_redirect_response=False)
+        team.refresh_from_db()
+        self.assertFalse(team.is_verified_by_firewallz)
+
+    def test_approve_team_rejects_unverified_members(self):
+        team = self.team_with_members("CHESS", 2, verified=False)
+        self.client.post(reverse("approve_team", args=[team.pk]))
+        team.refresh_from_db()
+        self.assertFalse(team.is_verified_by_firewallz)
+
+    def test_approve_team_query_count_is_constant_in_team_size(self):
+        small = self.team_with_members("CHESS", 1)
+        large = self.team_with_members("CARROM", 4)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse("approve_team", args=[small.pk]))
+        baseline = len(ctx.captured_queries)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse("approve_team", args=[large.pk]))
+        self.assertEqual(len(ctx.captured_queries), baseline)
+        large.refresh_from_db()
+        self.assertTrue(large.is_verified_by_firewallz)
+
+    def test_approve_teams_approves_a_whole_college(self):
+        ready = [self.team_with_members(name, 2) for name in ("CHESS", "CARROM", "SQUASH")]
+        blocked = self.team_with_members("TENNIS", 1, verified=False)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(reverse("approve_teams"), {"college_id": self.college.pk})
+        self.assertLess(len(ctx.captured_queries), 12)
+        self.assertEqual(
+            Team.objects.filter(pk__in=[t.pk for t in ready], is_verified_by_firewallz=True).count(), 3
+        )
+        blocked.refresh_from_db()
+        self.assertFalse(blocked.is_verified_by_firewallz)
+
+    def test_cached_team_list_rows_follow_their_data(self):
+        cache.clear()
+        team = self.team_with_members("CHESS", 1)
+        response = self.client.get(reverse("team_list"))
+        version = response.context["rows_version"]
+        self.assertEqual(self.client.get(reverse("team_list")).context["rows_version"], version)
+        College.objects.filter(pk=team.college_id).update(name="Renamed College", updated_at=timezone.now())
+        response = self.client.get(reverse("team_list"))
+        self.assertNotEqual(response.context["rows_version"], version)
+        self.assertContains(response, "Renamed College")
+        # The approve buttons submit a form outside the cached rows, which holds the token
+        self.assertContains(response, 'form="approve-team-form"')
+        self.assertContains(response, '<form id="approve-team-form" method="post"><input type="hidden" name="csrfmiddlewaretoken"')
+
+    def test_team_list_rows_follow_approval(self):
+        cache.clear()
+        team = self.team_with_members("CHESS", 1)
+        response = self.client.get(reverse("team_list"))
+        self.assertContains(response, "Not Approved")
+        self.assertContains(response, reverse("approve_team", args=[team.pk]))
+        self.client.post(reverse("approve_team", args=[team.pk]))
+        response = self.client.get(reverse("team_list"))
+        self.assertNotContains(response, "Not Approved")
+        self.assertNotContains(response, reverse("approve_team", args=[team.pk]))
+
+
+class BulkPlayerApprovalTests(CollegeTestCase):
+    def setUp(self):
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+
+    def test_players_cannot_approve_players(self):
+        player = make_player(self.college, "ok@example.com")
+        self.client.force_login(player.auth_user)
+        for response in (
+            self.client.post(reverse("approve_players"), {"player_ids": [player.pk]}),
+            self.client.post(reverse("approve_player", args=[player.pk])),
+        ):
+            self.assertRedirects(response, "/firewallz/admin/login/", fetch_redirect_response=False)
+        player.refresh_from_db()
+        self.assertFalse(player.verified_by_firewallz)
+
+    def test_approves_confirmed_players_and_reports_failures(self):
+        confirmed = [make_player(self.college, f"ok{i}@example.com") for i in range(3)]
+        unconfirmed = make_player(self.college, "no@example.com", status="pcr_unconfirmed")
+        ids = [p.pk for p in confirmed] + [unconfirmed.pk, "not-a-uuid"]
+        response = self.client.post(reverse("approve_players"), {"player_ids": ids}, follow=True)
+        self.assertEqual(Player.objects.filter(verified_by_firewallz=True).count(), 3)
+        unconfirmed.refresh_from_db()
+        self.assertFalse(unconfirmed.verified_by_firewallz)
+        texts = [str(m) for m in response.context["messages"]]
+        self.assertIn("Cannot approve no: player is not PCr confirmed.", texts)
+        self.assertIn("Invalid player id not-a-uuid.", texts)
+        self.assertIn("Approved 3 player(s).", texts)
+
+    def test_query_count_is_constant_in_number_of_players(self):
+        def approve(players):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.post(reverse("approve_players"), {"player_ids": [p.pk for p in players]})
+            return len(ctx.captured_queries)
+
+        baseline = approve([make_player(self.college, "first@example.com")])
+        many = [make_player(self.college, f"many{i}@example.com") for i in range(5)]
+        self.assertEqual(approve(many), baseline)
+
+
+class TeamPlayerTableTests(PlayerTestCase):
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+
+    def rows(self, *sport_names):
+        rows = []
+        for sport_name in sport_names:
+            team_player = TeamPlayer.objects.select_related("player", "team__sport", "team__college").get(
+                pk=enroll(self.player, sport_name).pk
+            )
+            event = Event.objects.create(sport=team_player.team.sport, name="Open")
+            rows.append({"event": event, "team_player": team_player})
+        return rows
+
+    def render(self, rows):
+        with CaptureQueriesContext(connection) as ctx:
+            html = TeamPlayerTable(rows).as_html(self.request)
+        return html, len(ctx.captured_queries)
+
+    def test_query_count_is_constant_in_number_of_rows(self):
+        _, baseline = self.render(self.rows("CHESS"))
+        _, queries = self.render(self.rows("CARROM", "SQUASH", "TENNIS"))
+        self.assertEqual(queries, baseline)
+
+    def test_precomputed_paid_flag_skips_lookup(self):
+        rows = self.rows("CHESS")
+        rows[0]["is_paid"] = True
+        html, queries = self.render(rows)
+        self.assertIn("Print Receipt", html)
+        self.assertEqual(queries, 0)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.names = [f"College {i}" for i in range(5)]
+        for name in self.names:
+            College.objects.create(name=name, address="Somewhere")
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+
+    def walk(self, **params):
+        seen, cursor = [], None
+        while True:
+            query = dict(params, page_size=2)
+            if cursor:
+                query["cursor"] = cursor
+            page = self.client.get(reverse("college_list"), query).context["page"]
+            self.assertLessEqual(len(page), 2)
+            seen.extend(college.name for college in page)
+            if not page.has_next:
+                return seen
+            cursor = page.next_cursor
+
+    def test_walks_every_row_once_in_order(self):
+        self.assertEqual(self.walk(), self.names)
+        self.assertEqual(self.walk(sort="-name"), self.names[::-1])
+        self.assertEqual(self.walk(sort="created_at"), self.names)
+
+    def test_filters_and_ignores_bad_parameters(self):
+        response = self.client.get(reverse("college_list"), {"q": "College 3", "cursor": "garbage", "sort": "address"})
+        self.assertEqual([c.name for c in response.context["page"]], ["College 3"])
+        self.assertEqual(response.context["page"].sort, "name")
+
+
+class AdminDashboardStatsTests(CollegeTestCase):
+    def setUp(self):
+        cache.delete(DASHBOARD_STATS_CACHE_KEY)
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+
+    def get_dashboard(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("admin_dashboard"))
+        return response, len(ctx.captured_queries)
+
+    def test_counts(self):
+        enroll(make_player(self.college, "one@example.com"), "CHESS")
+        make_player(self.college, "coach@example.com", is_coach=True)
+        response, _ = self.get_dashboard()
+        for key, expected in [
+            ("total_players", 1), ("total_coaches", 1), ("pcr_approved_coaches", 1),
+            ("total_teams", 1), ("total_colleges", 1), ("pcr_approved_players", 1),
+        ]:
+            self.assertEqual(response.context[key], expected, key)
+
+    def test_stats_are_cached_until_a_model_changes(self):
+        _, cold = self.get_dashboard()
+        _, warm = self.get_dashboard()
+        self.assertEqual(cold - warm, 4)
+        make_player(self.college, "one@example.com")
+        response, queries = self.get_dashboard()
+        self.assertEqual(queries, cold)
+        self.assertEqual(response.context["total_players"], 1)
+
+    def test_removing_a_team_player_refreshes_the_stats(self):
+        team_player = enroll(make_player(self.college, "one@example.com"), "CHESS")
+        self.assertEqual(self.get_dashboard()[0].context["pcr_approved_players"], 1)
+        team_player.soft_delete()
+        self.assertEqual(self.get_dashboard()[0].context["pcr_approved_players"], 0)
+
+    def test_teams_of_deleted_colleges_still_count(self):
+        enroll(make_player(self.college, "one@example.com"), "CHESS")
+        College.objects.filter(pk=self.college.pk).update(is_deleted=True)
+        cache.delete(DASHBOARD_STATS_CACHE_KEY)
+        response, _ = self.get_dashboard()
+        self.assertEqual((response.context["total_teams"], response.context["total_colleges"]), (1, 0))
+
+
+class RegistrationCounterTests(PlayerTestCase):
+    def test_counters_follow_registrations(self):
+        team_player = enroll(self.player, "CHESS")
+        event = Event.objects.create(sport=team_player.team.sport, name="Blitz")
+        team_player.events.add(event)
+        self.assertEqual(RegistrationCounter.value("event", self.college.pk, event.pk), 1)
+        event.team_players.add(enroll(make_player(self.college, "b@example.com"), "CHESS"))
+        self.assertEqual(RegistrationCounter.value("event", self.college.pk, event.pk), 2)
+        event.team_players.clear()
+        self.assertEqual(RegistrationCounter.value("event", self.college.pk, event.pk), 0)
+
+        team_player.events.remove(event)
+        self.assertEqual(RegistrationCounter.value("event", self.college.pk, event.pk), 0)
+        team_player.events.add(event)
+        team_player.soft_delete()
+        team_player.soft_delete()
+        self.assertEqual(RegistrationCounter.value("event", self.college.pk, event.pk), 0)
+
+    def test_counters_are_adjusted_not_recounted(self):
+        team_player = enroll(self.player, "CHESS")
+        event = Event.objects.create(sport=team_player.team.sport, name="Blitz")
+        team_player.events.add(event)
+        # Reading the links plus one UPDATE, and no counter work at all for a player save
+        with CaptureQueriesContext(connection) as removed:
+            team_player.events.remove(event)
+        counter_queries = [q["sql"] for q in removed if "registrationcounter" in q["sql"]]
+        self.assertEqual(len(counter_queries), 1)
+        self.assertTrue(counter_queries[0].startswith("UPDATE"))
+        with CaptureQueriesContext(connection) as saved:
+            self.player.save()
+        self.assertFalse([q for q in saved if "registrationcounter" in q["sql"]])
+
+    def test_group_counter_limits_membership(self):
+        group = Group.objects.create(name="Bus 1", college=self.college, max_size=1)
+        group.add_player(self.player)
+        self.assertEqual(RegistrationCounter.value("group", group.pk), 1)
+        self.player.approval_groups.clear()
+        self.assertEqual(RegistrationCounter.value("group", group.pk), 0)
+        group.add_player(self.player)
+        with self.assertRaises(ValidationError):
+            group.add_player(make_player(self.college, "other@example.com"))
+
+    def test_rebuild_matches_maintained_counts(self):
+        team_player = enroll(self.player, "CHESS")
+        team_player.events.add(Event.objects.create(sport=team_player.team.sport, name="Blitz"))
+        maintained = dict(RegistrationCounter.objects.values_list("key", "count"))
+        RegistrationCounter.objects.all().delete()
+        call_command("rebuild_counters", stdout=StringIO())
+        rebuilt = dict(RegistrationCounter.objects.values_list("key", "count"))
+        self.assertEqual(rebuilt, {key: count for key, count in maintained.items() if count})
+
+
+class ConcurrentSportsRegistrationTests(TransactionTestCase):
+    """
+    Fires simultaneous registrations for the same sport from one college and checks
+    that Sport.max_players still holds
+    """
+
+    MAX_PLAYERS = 3
+    SIGN_UPS = 8
+
+    def setUp(self):
+        college = make_college()
+        self.sport = Sport.objects.create(name="CHESS", gender="Male", max_players=self.MAX_PLAYERS)
+        Event.objects.create(sport=self.sport, name="Blitz")
+        self.players = []
+        for i in range(self.SIGN_UPS):
+            player = make_player(college, f"player{i}@example.com")
+            transaction = Transaction.objects.create(
+                paid_by=player, paid_for=player, reference_no=str(i), type="PLAYER", status="SUCCESS"
+            )
+            BasePayment.objects.create(player=player, transaction=transaction, transaction_status="SUCCESS")
+            self.players.append(player)
+
+    def register(self, client, barrier, responses):
+        try:
+            barrier.wait(timeout=30)
+            responses.append(client.post(reverse("sports_registration"), {"sport": self.sport.pk}))
+        finally:
+            connection.close()
+
+    def test_quota_holds_under_parallel_sign_ups(self):
+        clients = []
+        for player in self.players:
+            client = Client()
+            client.force_login(player.auth_user)
+            clients.append(client)
+        barrier = threading.Barrier(self.SIGN_UPS)
+        responses = []
+        threads = [threading.Thread(target=self.register, args=(c, barrier, responses)) for c in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Every sign-up got an answer: a redirect to the dashboard, or the form again
+        # with the quota error
+        self.assertEqual(len(responses), self.SIGN_UPS)
+        accepted = [r for r in responses if r.status_code == 302]
+        rejected = [r for r in responses if r.status_code == 200]
+        self.assertEqual(len(accepted), self.MAX_PLAYERS)
+        self.assertEqual(len(rejected), self.SIGN_UPS - self.MAX_PLAYERS)
+        for response in rejected:
+            self.assertContains(response, "already fulfilled the required number of participants")
+        enrolled = TeamPlayer.objects.filter(team__sport=self.sport).count()
+        self.assertEqual(enrolled, self.MAX_PLAYERS)
+        self.assertEqual(Team.objects.filter(sport=self.sport).count(), 1)
+
+
+class RequestMetricsTests(PlayerTestCase):
+    def setUp(self):
+        histogram.clear()
+
+    def test_server_timing_header_and_histogram(self):
+        self.client.force_login(self.player.auth_user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("player_dashboard"))
+        self.assertIn(f'desc="{len(ctx.captured_queries)} queries"', response["Server-Timing"])
+        self.assertIn("tpl;dur=", response["Server-Timing"])
+        (row,) = histogram.summary()
+        self.assertEqual(row["url_name"], "player_dashboard")
+        self.assertEqual(row["max_queries"], len(ctx.captured_queries))
+
+    def test_metrics_page_is_admin_only(self):
+        self.client.force_login(self.player.auth_user)
+        self.assertRedirects(
+            self.client.get(reverse("request_metrics")), "/firewallz/admin/login/", fetch_redirect_response=False
+        )
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+        # The rejected request above is already in the histogram
+        self.assertContains(self.client.get(reverse("request_metrics")), "<td>request_metrics</td>")
+
+
+class BenchmarkSuiteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.totals = generate_fest_data(colleges=3, players_per_college=8, sports=4, seed=7, tag="t")
+
+    def test_generator_bulk_creates_consistent_data(self):
+        self.assertEqual(College.objects.count(), 3)
+        self.assertEqual(Player.objects.count(), 24)
+        self.assertEqual(TeamPlayer.objects.count(), self.totals["team_players"])
+        for team_player in TeamPlayer.objects.select_related("player", "team"):
+            self.assertEqual(team_player.player.college_id, team_player.team.college_id)
+            self.assertFalse(team_player.player.is_coach)
+        event = Event.objects.first()
+        college = College.objects.first()
+        self.assertEqual(
+            RegistrationCounter.value("event", college.pk, event.pk),
+            TeamPlayer.objects.filter(events=event, player__college=college).count(),
+        )
+
+    def test_every_replayable_view_responds(self):
+        report = run_benchmarks(iterations=1)
+        self.assertEqual(report["skipped"], [])
+        self.assertIn("player_dashboard", report["views"])
+        self.assertIn("print_receipt", report["views"])
+        for name, row in report["views"].items():
+            self.assertEqual(row["status"], 200, name)
+        # The temporary admin is gone again
+        self.assertFalse(get_user_model().objects.filter(user_type="admin").exists())
+
+    def test_benchmarks_can_run_as_an_existing_admin(self):
+        admin = make_user("ops@example.com", user_type="admin")
+        report = run_benchmarks(iterations=1, only=["admin_dashboard"], admin_username=admin.username)
+        self.assertEqual(report["views"]["admin_dashboard"]["status"], 200)
+        self.assertEqual(list(get_user_model().objects.filter(user_type="admin")), [admin])
+
+    def test_compare_flags_extra_queries(self):
+        baseline = {"views": {"home": {"queries": 1, "p95_ms": 10.0}}}
+        current = {"views": {"home": {"queries": 2, "p95_ms": 10.5}}}
+        self.assertEqual(compare_reports(baseline, current), ["home: 1 -> 2 queries"])
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every replayable view gets a query budget, and must issue the same number of queries
+    whether the fest is small or several times larger. An N+1 shows up as a count that
+    grows with the second scale.
+    """
+
+    QUERY_BUDGETS = {
+        "register_player": 0,
+        "login_player": 0,
+        "home": 0,
+        "player_details": 4,
+        "player_profile": 4,
+        "view_team_members": 4,
+        "player_dashboard": 4,
+        "sports_registration": 5,
+        "print_receipt": 5,
+        "payment_status": 5,
+        "admin_login": 0,
+        "admin_dashboard": 2,
+        "pcr_approved_players": 4,
+        "pcr_approved_coaches": 3,
+        "firewallz_approved_players": 4,
+        "firewallz_approved_coaches": 3,
+        "college_list": 3,
+        "players_per_college": 4,
+        "team_list": 3,
+        "group_list": 3,
+        "view_team_members_admin": 4,
+        "request_metrics": 2,
+        "export_players": 3,
+        "export_teams": 3,
+        "export_payments": 4,
+        "import_roster": 2,
+    }
+
+    def busiest_paid_player(self, tag):
+        team = (
+            Team.objects.filter(team_code__startswith=f"{tag}-", team_players__sport_payment__isnull=False)
+            .annotate(n=Count("team_players"))
+            .order_by("-n")
+            .first()
+        )
+        # A player who also paid the base fee, so sports_registration renders the full form
+        return (
+            SportPayment.objects.filter(team_player__team=team, team_player__player__base_payment__isnull=False)
+            .values_list("team_player__player__email", flat=True)
+            .first()
+        )
+
+    def test_every_route_has_a_budget(self):
+        routes = {pattern.name or pattern.callback.__name__ for pattern in urls.urlpatterns}
+        self.assertEqual(routes - SKIPPED_ROUTES, set(self.QUERY_BUDGETS))
+
+    def test_query_counts_stay_flat_as_data_grows(self):
+        generate_fest_data(colleges=2, players_per_college=6, sports=3, seed=1, tag="s")
+        small = run_benchmarks(iterations=1, player_email=self.busiest_paid_player("s"))
+        generate_fest_data(colleges=6, players_per_college=30, sports=3, seed=2, tag="l")
+        large = run_benchmarks(iterations=1, player_email=self.busiest_paid_player("l"))
+        # The larger fest must actually put more rows on the pages being compared
+        self.assertGreater(large["meta"]["team_players"], 4 * small["meta"]["team_players"])
+
+        for name, budget in self.QUERY_BUDGETS.items():
+            with self.subTest(view=name):
+                self.assertEqual(large["views"][name]["status"], 200)
+                self.assertLessEqual(small["views"][name]["max_queries"], budget)
+                self.assertEqual(large["views"][name]["max_queries"], small["views"][name]["max_queries"])
+
+
+class DatabaseUrlTests(SimpleTestCase):
+    def test_sqlite_paths(self):
+        self.assertEqual(database_from_url("sqlite:///db.sqlite3", "/srv/app")["NAME"].as_posix(), "/srv/app/db.sqlite3")
+        self.assertEqual(database_from_url("sqlite:////var/db.sqlite3", "/srv/app")["NAME"], "/var/db.sqlite3")
+
+    @mock.patch.dict("os.environ", {"DB_CONN_MAX_AGE": "120"})
+    def test_postgres_persistent_connections(self):
+        config = database_from_url("postgres://fest:s%40cret@db:5433/firewallz?sslmode=require", "/srv/app")
+        self.assertEqual(config["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(
+            (config["NAME"], config["USER"], config["PASSWORD"], config["HOST"], config["PORT"]),
+            ("firewallz", "fest", "s@cret", "db", 5433),
+        )
+        self.assertEqual(config["CONN_MAX_AGE"], 120)
+        self.assertTrue(config["CONN_HEALTH_CHECKS"])
+        self.assertEqual(config["OPTIONS"], {"sslmode": "require"})
+
+    @mock.patch.dict("os.environ", {"DB_POOL": "1", "DB_POOL_MAX_SIZE": "20"})
+    def test_postgres_pool_disables_persistent_connections(self):
+        config = database_from_url("postgresql://db/firewallz", "/srv/app")
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertEqual(config["OPTIONS"]["pool"]["max_size"], 20)
+
+
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        @read_from_replica
+        def reporting_view(request, write=False):
+            if write:
+                router.db_for_write(Player)
+            return router.db_for_read(Player)
+
+        self.view = reporting_view
+        replica = dict(settings.DATABASES["default"])
+        patcher = mock.patch.dict(settings.DATABASES, {"replica": replica})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reporting_reads_go_to_replica(self):
+        self.assertEqual(self.view(self.factory.get("/")), "replica")
+        # Outside a reporting view reads stay on the primary
+        self.assertEqual(router.db_for_read(Player), "default")
+
+    def test_cached_dashboard_stats_are_read_from_primary(self):
+        cache.clear()
+        view = read_from_replica(lambda request: get_dashboard_stats())
+        with CaptureQueriesContext(connections["default"]) as primary:
+            view(self.factory.get("/"))
+        self.assertEqual(len(primary), 4)
+
+    def test_writes_and_post_requests_stay_on_primary(self):
+        self.assertEqual(self.view(self.factory.get("/"), write=True), "default")
+        self.assertEqual(self.view(self.factory.post("/")), "default")
+
+    def test_recent_writer_is_pinned_to_primary(self):
+        college = make_college()
+        admin = make_user("admin@example.com", user_type="admin")
+        self.client.force_login(admin)
+        player = make_player(college, "player@example.com")
+        self.client.post(reverse("approve_player", args=[player.pk]))
+        self.assertIn(PRIMARY_PIN_COOKIE, self.client.cookies)
+        request = self.factory.get("/")
+        request.COOKIES[PRIMARY_PIN_COOKIE] = self.client.cookies[PRIMARY_PIN_COOKIE].value
+        self.assertEqual(self.view(request), "default")
+
+
+class ReferenceDataCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.sport = Sport.objects.create(name="CHESS", gender="Male", max_players=4)
+
+    def test_form_choices_and_validation_come_from_cache(self):
+        self.assertEqual(len(SportsRegistrationForm().fields["sport"].choices), 2)
+        with self.assertNumQueries(0):
+            choices = [label for _, label in SportsRegistrationForm().fields["sport"].choices]
+            form = SportsRegistrationForm({"sport": str(self.sport.pk)})
+            self.assertTrue(form.is_valid())
+        self.assertEqual(choices, ["---------", "CHESS Male"])
+        self.assertEqual(form.cleaned_data["sport"], self.sport)
+        self.assertFalse(SportsRegistrationForm({"sport": "not-a-sport"}).is_valid())
+
+    def test_saving_reference_data_invalidates_the_cache(self):
+        self.assertEqual(len(SportsRegistrationForm().fields["sport"].choices), 2)
+        Sport.objects.create(name="CARROM", gender="Male", max_players=4)
+        labels = [label for _, label in SportsRegistrationForm().fields["sport"].choices]
+        self.assertEqual(labels, ["---------", "CARROM Male", "CHESS Male"])
+
+    def test_only_representative_display_changes_invalidate_colleges(self):
+        college = make_college()
+        player = make_player(college, "player@example.com")
+        other = make_player(college, "other@example.com")
+        college.representative = player
+        college.save()
+        cached_colleges()
+        with self.assertNumQueries(0):
+            cached_colleges()
+        player.phone_number = 9876543210
+        player.save()
+        other.name = "Renamed"
+        other.save()
+        with self.assertNumQueries(0):
+            cached_colleges()
+        player.name = "Renamed"
+        player.save()
+        with self.assertNumQueries(1):
+            cached_colleges()
+        player.delete()
+        self.assertIsNone(cached_colleges()[0].representative_id)
+
+    def test_college_list_pages_are_cached_until_a_college_changes(self):
+        make_college("First College", "FC")
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+        self.client.get(reverse("college_list"))
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("college_list"))
+            # Unknown parameters and an invalid cursor land on the same cached first page
+            self.client.get(reverse("college_list"), {"x": "1", "cursor": "garbage", "sort": "nope"})
+        self.assertFalse(any("firewallz_college" in q["sql"] for q in ctx.captured_queries))
+        make_college("Second College", "SC")
+        self.assertContains(self.client.get(reverse("college_list")), "Second College")
+
+
+class StaticAssetTests(TestCase):
+    def test_pages_link_stylesheets_instead_of_inlining_them(self):
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+        for name in ("admin_dashboard", "team_list", "login_player"):
+            response = self.client.get(reverse(name))
+            self.assertNotContains(response, "<style")
+        self.assertContains(self.client.get(reverse("admin_dashboard")), "/static/css/admin_base.css")
+
+    def test_shared_list_partials_have_no_inline_styles(self):
+        templates = Path(__file__).parent / "templates"
+        for name in ("pagination.html", "list_filters.html"):
+            self.assertNotIn('style="', (templates / name).read_text(), name)
+
+    def test_every_linked_stylesheet_exists(self):
+        pattern = re.compile(r"{% static '(css/[\w.]+)' %}")
+        templates = Path(__file__).parent / "templates"
+        for template in templates.glob("*.html"):
+            for path in pattern.findall(template.read_text()):
+                self.assertIsNotNone(finders.find(path), f"{template.name}: {path}")
+
+
+class PaymentFlowTests(PlayerTestCase):
+    def setUp(self):
+        self.client.force_login(self.player.auth_user)
+
+    def checkout(self, response, outcome):
+        """Follows the redirect to the local gateway and posts its signed ``outcome``"""
+        page = self.client.get(response["Location"])
+        payload = page.context[f"{outcome}_payload"]
+        return Client().post(reverse("payment_callback"), {"payload": payload})
+
+    def test_base_payment_stays_pending_until_the_gateway_calls_back(self):
+        response = self.client.post(reverse("make_base_payment"))
+        payment = BasePayment.objects.get(player=self.player)
+        self.assertEqual(payment.transaction_status, "PENDING")
+        self.assertEqual(payment.transaction.status, "PENDING")
+        self.assertRedirects(response, payment.transaction.payment_url, fetch_redirect_response=False)
+        self.assertTrue(self.client.get(reverse("sports_registration")).context["show_payment_button"])
+        # Starting again resumes the same checkout
+        self.assertEqual(self.client.post(reverse("make_base_payment"))["Location"], response["Location"])
+
+        callback = self.checkout(response, "success")
+        self.assertRedirects(
+            callback, reverse("payment_status", args=[payment.transaction_id]), fetch_redirect_response=False
+        )
+        payment.refresh_from_db()
+        self.assertEqual(payment.transaction_status, "SUCCESS")
+        self.assertContains(self.client.get(callback["Location"]), "Payment successful")
+        self.assertNotIn("show_payment_button", self.client.get(reverse("sports_registration")).context)
+
+    def test_declined_payment_can_be_retried(self):
+        self.checkout(self.client.post(reverse("make_base_payment")), "failed")
+        self.assertEqual(BasePayment.objects.get(player=self.player).transaction_status, "FAILED")
+        self.client.post(reverse("make_base_payment"))
+        self.assertEqual(
+            sorted(BasePayment.objects.values_list("transaction_status", flat=True)), ["FAILED", "PENDING"]
+        )
+
+    def test_lost_callback_times_out_and_allows_a_new_checkout(self):
+        response = self.client.post(reverse("make_base_payment"))
+        stale = BasePayment.objects.get(player=self.player).transaction
+        # Resumed while the callback can still arrive
+        self.assertEqual(self.client.post(reverse("make_base_payment"))["Location"], response["Location"])
+        Transaction.objects.filter(pk=stale.pk).update(
+            created_at=timezone.now() - timedelta(seconds=settings.PAYMENT_CALLBACK_MAX_AGE + 1)
+        )
+        retry = self.client.post(reverse("make_base_payment"))
+        self.assertNotEqual(retry["Location"], response["Location"])
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, "TIMEOUT")
+        self.assertEqual(
+            sorted(BasePayment.objects.values_list("transaction_status", flat=True)), ["PENDING", "TIMEOUT"]
+        )
+        # A callback for the abandoned checkout no longer settles it
+        self.checkout(response, "success")
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, "TIMEOUT")
+        self.checkout(retry, "success")
+        self.assertNotIn("show_payment_button", self.client.get(reverse("sports_registration")).context)
+
+    def test_callbacks_are_verified_and_idempotent(self):
+        response = self.client.post(reverse("make_base_payment"))
+        self.assertEqual(Client().post(reverse("payment_callback"), {"payload": "forged"}).status_code, 400)
+        self.checkout(response, "success")
+        self.checkout(response, "failed")
+        self.assertEqual(BasePayment.objects.get(player=self.player).transaction_status, "SUCCESS")
+
+    def test_only_admins_can_mark_a_player_paid(self):
+        url = reverse("mark_coach_paid", args=[self.player.pk])
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertRedirects(self.client.post(url), "/firewallz/admin/login/", fetch_redirect_response=False)
+        self.assertFalse(BasePayment.objects.exists())
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+        self.assertEqual(self.client.post(reverse("mark_coach_paid", args=[uuid.uuid4()])).status_code, 404)
+        self.client.post(url)
+        self.assertEqual(BasePayment.objects.get(player=self.player).transaction_status, "SUCCESS")
+
+    def test_partial_gateway_cannot_be_created(self):
+        class CheckoutOnly(PaymentGateway):
+            def checkout_url(self, txn):
+                return "/"
+
+        with self.assertRaises(TypeError):
+            CheckoutOnly()
+
+    def test_local_checkout_is_disabled_outside_debug(self):
+        checkout_url = self.client.post(reverse("make_base_payment"))["Location"]
+        with override_settings(LOCAL_PAYMENT_GATEWAY_ENABLED=False):
+            self.assertEqual(self.client.get(checkout_url).status_code, 404)
+
+    def test_sport_payment_unlocks_the_receipt(self):
+        team_player = enroll(self.player, "CHESS")
+        team_player.events.add(Event.objects.create(sport=team_player.team.sport, name="Open"))
+        response = self.client.get(reverse("make_sport_payment", args=[team_player.pk]))
+        payment = SportPayment.objects.get(team_player=team_player)
+        self.assertEqual((payment.transaction_status, payment.amount), ("PENDING", SPORT_PAYMENT_AMOUNT))
+        self.assertRedirects(self.client.get(reverse("print_receipt", args=[team_player.pk])),
+                             reverse("player_dashboard"), fetch_redirect_response=False)
+        self.checkout(response, "success")
+        self.assertEqual(self.client.get(reverse("print_receipt", args=[team_player.pk])).status_code, 200)
+
+
+class CsvExportTests(CollegeTestCase):
+    def setUp(self):
+        self.other = make_college("Other College", "OC", address="Elsewhere")
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+
+    def export(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+
+    def test_players_export_applies_the_listing_filters(self):
+        make_player(self.college, "alice@example.com", verified_by_firewallz=True)
+        make_player(self.college, "bob@example.com")
+        make_player(self.other, "carol@example.com", verified_by_firewallz=True)
+        rows = self.export("export_players", college=self.college.pk, verified="1")
+        self.assertEqual(rows[0][:2], ["Name", "Email"])
+        self.assertEqual([row[1] for row in rows[1:]], ["alice@example.com"])
+        self.assertEqual(rows[1][4], "Test College")
+        rows = self.export("export_players", q="carol")
+        self.assertEqual([row[1] for row in rows[1:]], ["carol@example.com"])
+
+    def test_teams_export_lists_members_in_one_row(self):
+        for email in ("alice@example.com", "bob@example.com"):
+            enroll(make_player(self.college, email), "CHESS")
+        enroll(make_player(self.other, "carol@example.com"), "CARROM")
+        rows = self.export("export_teams")
+        self.assertEqual(rows[0][-1], "Members")
+        members = {row[3]: row[-1] for row in rows[1:]}
+        self.assertEqual(members, {"Test College": "alice; bob", "Other College": "carol"})
+
+    def test_payments_export_streams_both_kinds(self):
+        team_player = enroll(make_player(self.college, "player@example.com", name="=cmd"), "CHESS")
+        player = team_player.player
+        for reference_no, model, kwargs in (
+            ("1", BasePayment, {"player": player}),
+            ("2", SportPayment, {"team_player": team_player}),
+        ):
+            transaction = Transaction.objects.create(
+                paid_by=player, paid_for=player, reference_no=reference_no, type="PLAYER", status="SUCCESS"
+            )
+            model.objects.create(transaction=transaction, transaction_status="SUCCESS", **kwargs)
+        rows = self.export("export_payments", status="SUCCESS")
+        self.assertEqual([(row[0], row[8]) for row in rows[1:]], [("BASE", "1"), ("SPORT", "2")])
+        self.assertEqual(rows[2][7], "CHESS")
+        # Cells that a spreadsheet would evaluate are escaped
+        self.assertEqual(rows[1][4], "'=cmd")
+        self.assertEqual(self.export("export_payments", status="PENDING"), [PAYMENT_HEADER])
+
+    def test_exports_are_admin_only(self):
+        self.client.force_login(make_user("player@example.com"))
+        self.assertRedirects(
+            self.client.get(reverse("export_players")), "/firewallz/admin/login/", fetch_redirect_response=False
+        )
+
+
+class RosterImportTests(CollegeTestCase):
+    HEADER = "name,email,phone_number,gender,college,is_coach\n"
+
+    def setUp(self):
+        cache.clear()
+
+    def players_csv(self, count, start=0):
+        return StringIO(self.HEADER + "".join(
+            f"Player {i},p{i}@example.com,98765{i:05d},male,tc,\n" for i in range(start, start + count)
+        ))
+
+    def test_players_are_created_in_batches_with_their_accounts(self):
+        report = import_players(self.players_csv(5), batch_size=2)
+        self.assertEqual((report.created, report.errors), (5, []))
+        player = Player.objects.select_related("auth_user", "college").get(email="p3@example.com")
+        self.assertEqual((player.college, player.gender, player.phone_number), (self.college, "Male", 9876500003))
+        self.assertFalse(player.auth_user.has_usable_password())
+        self.assertEqual(player.auth_user.profile.name, "Player 3")
+
+    def test_query_count_does_not_grow_with_rows(self):
+        import_players(self.players_csv(1))
+        with CaptureQueriesContext(connection) as few:
+            import_players(self.players_csv(3, start=1))
+        with CaptureQueriesContext(connection) as many:
+            import_players(self.players_csv(30, start=4))
+        self.assertEqual(len(many), len(few))
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        make_player(self.college, "taken@example.com")
+        rows = StringIO(self.HEADER + "\n".join([
+            "Ok,ok@example.com,9876543210,Female,Test College,yes",
+            "Bad Email,not-an-email,9876543210,Male,TC,",
+            "Unknown,unknown@example.com,12345,Male,XYZ,",
+            "Taken,taken@example.com,9876543210,Male,TC,",
+            "Again,OK@example.com,9876543210,Male,TC,",
+            f"{'N' * 101},long@example.com,9876543210,Male,TC,",
+            f"Long Email,{'e' * 140}@example.com,9876543210,Male,TC,",
+        ]))
+        report = import_players(rows)
+        self.assertEqual(report.created, 1)
+        self.assertTrue(Player.objects.get(email="ok@example.com").is_coach)
+        errors = dict(report.errors)
+        self.assertEqual(sorted(errors), [3, 4, 5, 6, 7, 8])
+        self.assertIn("Invalid email", errors[3])
+        self.assertIn("not 10 digits", errors[4])
+        self.assertIn("Unknown college 'XYZ'", errors[4])
+        self.assertIn("already exists", errors[5])
+        self.assertIn("earlier in the file", errors[6])
+        # Over-length values would fail the insert with a DataError on PostgreSQL
+        self.assertIn("name is longer than 100 characters", errors[7])
+        self.assertIn("email is longer than 150 characters", errors[8])
+
+    def test_colleges_command_writes_an_error_report(self):
+        self.assertEqual(len(cached_colleges()), 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            source, errors = Path(tmp) / "colleges.csv", Path(tmp) / "errors.csv"
+            source.write_text(
+                "name,letter_code,address,city,state\n"
+                "New College,nc,1 Road,Pilani,Rajasthan\n"
+                "test college,ZZ,2 Road,,\n"
+                "Other College,NC,3 Road,,\n"
+            )
+            call_command("import_roster", "colleges", str(source), errors=str(errors),
+                         stdout=StringIO(), stderr=StringIO())
+            report = list(csv.reader(errors.read_text().splitlines()))
+        self.assertEqual(College.objects.get(letter_code="NC").name, "New College")
+        self.assertEqual([row[0] for row in report], ["line", "3", "4"])
+        self.assertEqual(len(cached_colleges()), 2)
+
+    def test_admin_upload(self):
+        self.client.force_login(make_user("admin@example.com", user_type="admin"))
+        upload = SimpleUploadedFile("players.csv", self.players_csv(2).getvalue().encode())
+        response = self.client.post(reverse("import_roster"), {"kind": "players", "file": upload})
+        self.assertContains(response, "Imported 2 rows, rejected 0.")
+        upload = SimpleUploadedFile("players.csv", b"name,email\nX,x@example.com\n")
+        response = self.client.post(reverse("import_roster"), {"kind": "players", "file": upload})
+        self.assertContains(response, "Missing CSV columns: phone_number, gender, college")
+
+
+class ProvisioningTests(CollegeTestCase):
+    def provision(self, *emails):
+        rows = "".join(f"{email.split('@')[0]},{email},9876543210,Male,TC,\n" for email in emails)
+        with mock.patch.object(PBKDF2PasswordHasher, "encode", side_effect=AssertionError("hashed")):
+            report = import_players(StringIO(RosterImportTests.HEADER + rows))
+        return dict(report.activations)
+
+    def test_activation_link_sets_the_first_password_once(self):
+        link = self.provision("new@example.com")["new@example.com"]
+        profile = UserProfile.objects.get(email="new@example.com")
+        self.assertNotIn(link.rsplit("/", 2)[-2], profile.reg_token)
+        self.assertEqual(self.client.get(link).status_code, 200)
+
+        response = self.client.post(link, {"new_password1": "a-long-passphrase", "new_password2": "a-long-passphrase"})
+        self.assertRedirects(response, "/firewallz/player/dashboard/", fetch_redirect_response=False)
+        self.assertTrue(get_user_model().objects.get(username="new@example.com").check_password("a-long-passphrase"))
+        self.assertEqual(self.client.get(reverse("player_dashboard")).status_code, 200)
+        self.assertEqual(self.client.get(link).status_code, 404)
+
+    def test_reissued_links_replace_the_old_ones(self):
+        old = self.provision("new@example.com", "other@example.com")["new@example.com"]
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / "links.csv"
+            call_command("issue_activation_tokens", str(output), email=["NEW@example.com"],
+                         base_url="https://fest.example/", stdout=StringIO())
+            rows = list(csv.reader(output.read_text().splitlines()))
+        self.assertEqual(len(rows), 2)
+        email, new = rows[1]
+        self.assertEqual(email, "new@example.com")
+        self.assertTrue(new.startswith("https://fest.example/firewallz/player/activate/"))
+        self.assertEqual(self.client.get(old).status_code, 404)
+        self.assertEqual(self.client.get(new.removeprefix("https://fest.example")).status_code, 200)
+
+
+class LoginTests(PlayerTestCase):
+    def setUp(self):
+        cache.clear()
+        make_user("boss", user_type="admin")
+
+    def counting(self, method):
+        return mock.patch.object(
+            PBKDF2PasswordHasher, method, autospec=True, side_effect=getattr(PBKDF2PasswordHasher, method)
+        )
+
+    def test_player_login_checks_the_password_once(self):
+        with self.counting("verify") as verify:
+            response = self.client.post(
+                reverse("login_player"), {"email": "  Player@Example.com ", "password": "pass12345"}
+            )
+        self.assertRedirects(response, "/firewallz/player/dashboard/", fetch_redirect_response=False)
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(self.client.session["_auth_user_id"], str(self.player.auth_user.pk))
+
+    def test_player_login_rejects_bad_credentials_and_admins(self):
+        for email, password, error in (
+            ("player@example.com", "wrong", "Invalid email or password."),
+            ("nobody@example.com", "pass12345", "Invalid email or password."),
+        ):
+            response = self.client.post(reverse("login_player"), {"email": email, "password": password})
+            self.assertContains(response, error)
+        admin = make_user("admin@example.com", user_type="admin")
+        response = self.client.post(reverse("login_player"), {"email": admin.email, "password": "pass12345"})
+        self.assertContains(response, "You are not authorized to login as a Player.")
+        self.assertNotIn("_auth_user_id", self.client.session)
+
+    def test_admin_login_requires_the_password(self):
+        response = self.client.post(reverse("admin_login"), {"username": "boss", "password": "wrong"})
+        self.assertContains(response, "Invalid username or password.")
+        self.assertNotIn("_auth_user_id", self.client.session)
+        response = self.client.post(reverse("admin_login"), {"username": "boss", "password": "pass12345"})
+        self.assertRedirects(response, "/firewallz/admin/dashboard/", fetch_redirect_response=False)
+
+    def test_registration_hashes_the_password_once(self):
+        data = {
+            "name": "New Player", "email": "New@Example.com", "phone_number": "9876543210", "gender": "Male",
+            "password1": "a-long-passphrase", "password2": "a-long-passphrase",
+        }
+        with self.counting("encode") as encode, self.counting("verify") as verify:
+            response = self.client.post(reverse("register_player"), data)
+        self.assertRedirects(response, "/firewallz/player/details/", fetch_redirect_response=False)
+        self.assertEqual((encode.call_count, verify.call_count), (1, 0))
+        self.assertEqual(UserProfile.objects.get(auth_user__username="new@example.com").email, "new@example.com")
+
+
+@override_settings(LOGIN_THROTTLE_WINDOW=300, LOGIN_THROTTLE_IP_LIMIT=5, LOGIN_THROTTLE_ACCOUNT_LIMIT=3)
+class LoginThrottleTests(PlayerTestCase):
+    def setUp(self):
+        cache.clear()
+        make_user("boss", user_type="admin")
+
+    def attempt(self, email, password, ip="10.0.0.1"):
+        return self.client.post(
+            reverse("login_player"), {"email": email, "password": password}, REMOTE_ADDR=ip
+        )
+
+    def test_account_limit_skips_hashing(self):
+        for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+            self.assertContains(self.attempt("Player@example.com", "wrong", ip), "Invalid email or password.")
+        hasher = PBKDF2PasswordHasher
+        with mock.patch.object(hasher, "verify") as verify, mock.patch.object(hasher, "encode") as encode:
+            response = self.attempt("player@example.com", "pass12345", "10.0.0.4")
+        self.assertContains(response, "Too many failed login attempts.", status_code=429)
+        self.assertEqual((verify.call_count, encode.call_count), (0, 0))
+        self.assertNotIn("_auth_user_id", self.client.session)
+        self.assertEqual(short_circuit_counts(), {"ip": 0, "account": 1})
+
+    def test_ip_limit_covers_every_account(self):
+        for n in range(5):
+            self.attempt(f"nobody{n}@example.com", "wrong")
+        with mock.patch.object(PBKDF2PasswordHasher, "verify") as verify:
+            response = self.attempt("player@example.com", "pass12345")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(verify.call_count, 0)
+        self.assertEqual(short_circuit_counts(), {"ip": 1, "account": 0})
+        # Another client is unaffected
+        response = self.attempt("player@example.com", "pass12345", "10.0.0.9")
+        self.assertRedirects(response, "/firewallz/player/dashboard/", fetch_redirect_response=False)
+
+    def test_client_address_comes_from_the_configured_header(self):
+        request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.254", HTTP_X_FORWARDED_FOR="1.2.3.4, 5.6.7.8, 9.9.9.9")
+        # REMOTE_ADDR unless a deployment behind a proxy says otherwise
+        self.assertEqual(settings.LOGIN_THROTTLE_IP_HEADER, "REMOTE_ADDR")
+        self.assertEqual(client_ip(request), "10.0.0.254")
+        with override_settings(LOGIN_THROTTLE_IP_HEADER="HTTP_X_FORWARDED_FOR", LOGIN_THROTTLE_TRUSTED_PROXIES=2):
+            self.assertEqual(client_ip(request), "5.6.7.8")
+        with override_settings(LOGIN_THROTTLE_IP_HEADER="HTTP_X_FORWARDED_FOR", LOGIN_THROTTLE_TRUSTED_PROXIES=4):
+            self.assertIsNone(client_ip(request))
+        with override_settings(LOGIN_THROTTLE_IP_HEADER=""):
+            self.assertIsNone(client_ip(request))
+
+    @override_settings(LOGIN_THROTTLE_IP_HEADER="")
+    def test_empty_header_turns_the_ip_limit_off(self):
+        for n in range(8):
+            self.attempt(f"nobody{n}@example.com", "wrong")
+        response = self.attempt("player@example.com", "pass12345")
+        self.assertRedirects(response, "/firewallz/player/dashboard/", fetch_redirect_response=False)
+
+    def test_success_clears_the_account_count(self):
+        for _ in range(2):
+            self.attempt("player@example.com", "wrong")
+        self.assertEqual(self.attempt("player@example.com", "pass12345").status_code, 302)
+        self.client.logout()
+        for _ in range(2):
+            self.assertEqual(self.attempt("player@example.com", "wrong").status_code, 200)
+
+    def test_old_failures_slide_out_of_the_window(self):
+        with mock.patch("firewallz.throttle.time.time", return_value=3000.0):
+            for _ in range(3):
+                self.attempt("player@example.com", "wrong")
+            self.assertEqual(self.attempt("player@example.com", "wrong").status_code, 429)
+        # Halfway into the next window half of the earlier failures (1.5) still count
+        with mock.patch("firewallz.throttle.time.time", return_value=3450.0):
+            self.assertEqual(self.attempt("player@example.com", "wrong").status_code, 200)
+            self.assertEqual(self.attempt("player@example.com", "wrong").status_code, 200)
+            self.assertEqual(self.attempt("player@example.com", "wrong").status_code, 429)
+        with mock.patch("firewallz.throttle.time.time", return_value=3900.0):
+            self.assertEqual(self.attempt("player@example.com", "pass12345").status_code, 302)
+
+    def test_admin_login_is_throttled_and_metrics_reset(self):
+        for _ in range(3):
+            self.client.post(reverse("admin_login"), {"username": "boss", "password": "wrong"})
+        response = self.client.post(reverse("admin_login"), {"username": "boss", "password": "pass12345"})
+        self.assertContains(response, "Too many failed login attempts.", status_code=429)
+        admin = make_user("admin@example.com", user_type="admin")
+        self.client.force_login(admin)
+        self.assertContains(self.client.get(reverse("request_metrics")), "1 over the per-account limit")
+        self.client.post(reverse("request_metrics"))
+        self.assertEqual(short_circuit_counts(), {"ip": 0, "account": 0})
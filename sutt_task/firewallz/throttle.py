@@ -0,0 +1,124 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+THROTTLE_CACHE_PREFIX = "firewallz:login_throttle"
+SCOPES = ("ip", "account")
+
+
+def client_ip(request):
+    """
+    The client address as reported through LOGIN_THROTTLE_IP_HEADER, or None when that
+    is set empty to turn the per-IP limit off
+    """
+    header = settings.LOGIN_THROTTLE_IP_HEADER
+    if request is None or not header:
+        return None
+    value = request.META.get(header, "")
+    if header == "HTTP_X_FORWARDED_FOR":
+        # Each proxy appends the peer it saw, so only the trusted proxies' entries at the
+        # end are reliable; anything before them came from the client itself
+        hops = [hop.strip() for hop in value.split(",") if hop.strip()]
+        proxies = settings.LOGIN_THROTTLE_TRUSTED_PROXIES
+        value = hops[-proxies] if 0 < proxies <= len(hops) else ""
+    return value or None
+
+
+def limits(request, account):
+    """
+    [(scope, identifier, limit)] for the client and the account of a login attempt
+    """
+    pairs = [
+        ("ip", client_ip(request), settings.LOGIN_THROTTLE_IP_LIMIT),
+        ("account", account.strip().lower(), settings.LOGIN_THROTTLE_ACCOUNT_LIMIT),
+    ]
+    return [(scope, identifier, limit) for scope, identifier, limit in pairs if identifier]
+
+
+def bucket_keys(scope, identifier, now):
+    """
+    Returns (current bucket key, previous bucket key, fraction of the current window
+    elapsed). Identifiers are hashed so no email ends up in a cache key.
+    """
+    window = settings.LOGIN_THROTTLE_WINDOW
+    bucket = int(now // window)
+    digest = hashlib.sha256(identifier.encode()).hexdigest()[:32]
+    base = f"{THROTTLE_CACHE_PREFIX}:{scope}:{digest}"
+    return f"{base}:{bucket}", f"{base}:{bucket - 1}", (now % window) / window
+
+
+def blocked_scope(request, account):
+    """
+    The scope ("ip" or "account") whose failed logins over the last window reached its
+    limit, or None. The count slides: the previous window's failures are weighted by
+    how much of it still overlaps the last LOGIN_THROTTLE_WINDOW seconds. Costs a single
+    cache round trip.
+    """
+    now = time.time()
+    buckets = [(scope, limit, *bucket_keys(scope, identifier, now)) for scope, identifier, limit in limits(request, account)]
+    counts = cache.get_many([key for bucket in buckets for key in bucket[2:4]])
+    for scope, limit, current, previous, elapsed in buckets:
+        if counts.get(current, 0) + counts.get(previous, 0) * (1 - elapsed) >= limit:
+            return scope
+    return None
+
+
+def incr(key, timeout):
+    cache.add(key, 0, timeout)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout)
+
+
+def record_failure(request, account):
+    now = time.time()
+    for scope, identifier, _ in limits(request, account):
+        incr(bucket_keys(scope, identifier, now)[0], settings.LOGIN_THROTTLE_WINDOW * 2)
+
+
+def clear_account(account):
+    current, previous, _ = bucket_keys("account", account.strip().lower(), time.time())
+    cache.delete_many([current, previous])
+
+
+def short_circuit_key(scope):
+    return f"{THROTTLE_CACHE_PREFIX}:short_circuited:{scope}"
+
+
+def short_circuit_counts():
+    """
+    {scope: attempts rejected without checking a password}, across every process
+    sharing the cache
+    """
+    counts = cache.get_many([short_circuit_key(scope) for scope in SCOPES])
+    return {scope: counts.get(short_circuit_key(scope), 0) for scope in SCOPES}
+
+
+def reset_short_circuit_counts():
+    cache.delete_many([short_circuit_key(scope) for scope in SCOPES])
+
+
+def throttled_authenticate(request, account, **credentials):
+    """
+    authenticate() behind the login limits. Once the client or ``account`` has used up
+    its failed attempts, raises ValidationError (code "throttled") without hashing
+    anything. Otherwise returns the user, or None after recording the failure.
+    """
+    scope = blocked_scope(request, account)
+    if scope:
+        incr(short_circuit_key(scope), None)
+        raise ValidationError(
+            "Too many failed login attempts. Please try again in a few minutes.", code="throttled"
+        )
+    user = authenticate(request, **credentials)
+    if user is None:
+        record_failure(request, account)
+    else:
+        clear_account(account)
+    return user
@@ -4,6 +4,7 @@ urlpatterns = [
     path('register/', views.register_player, name='register_player'),
     path('player/login/', views.login_player, name='login_player'),
     path('player/logout/', views.logout_player, name='logout_player'),
+    path('player/activate/<uuid:profile_id>/<str:token>/', views.activate_account, name='activate_account'),
     path('', views.home),
     path('player/details/', views.player_details, name="player_details"),
     path('player/profile/', views.player_profile, name='player_profile'),
@@ -14,6 +15,9 @@ urlpatterns = [
     path('player/make_base_payment/', views.make_base_payment, name="make_base_payment"),
     path('player/make_sports_payment/<uuid:tp_id>/', views.make_sports_payment, name="make_sport_payment"),
     path('player/print_receipt/<uuid:team_player_id>/', views.print_receipt, name="print_receipt"),
+    path('player/payment/<uuid:transaction_id>/', views.payment_status, name="payment_status"),
+    path('payments/callback/', views.payment_callback, name="payment_callback"),
+    path('payments/local/<str:reference_no>/', views.local_gateway_checkout, name="local_gateway_checkout"),
     path('admin/login/', views.admin_login, name='admin_login'),
     path('admin/logout/', views.admin_logout, name='admin_logout'),
     path('admin/dashboard/', views.admin_dashboard, name='admin_dashboard'),
@@ -26,8 +30,16 @@ urlpatterns = [
     path('admin/teams/', views.team_list, name='team_list'),
     path('admin/groups/', views.group_list, name='group_list'),
     path('admin/approve_players/<uuid:player_id>', views.approve_player, name='approve_player'),
+    path('admin/approve_players/', views.approve_players, name='approve_players'),
     path('admin/view_team_member_admin/<uuid:team_id>/', views.view_team_members_admin, name='view_team_members_admin'),
+    path('admin/mark_paid/<uuid:player_id>/', views.mark_player_as_paid, name='mark_coach_paid'),
     path('admin/approve_team/<uuid:team_id>', views.approve_team, name='approve_team'),
+    path('admin/approve_teams/', views.approve_teams, name='approve_teams'),
+    path('admin/metrics/', views.request_metrics, name='request_metrics'),
+    path('admin/export/players.csv', views.export_players, name='export_players'),
+    path('admin/export/teams.csv', views.export_teams, name='export_teams'),
+    path('admin/export/payments.csv', views.export_payments, name='export_payments'),
+    path('admin/import/', views.import_roster, name='import_roster'),
     # path('player/print_receipt/<uuid:payment_id>/', views.print_receipt, name="print_receipt"),
     # path('player/profile/', views.player_profile, name='player_profile'),
 ]
\ No newline at end of file
@@ -1,17 +1,41 @@
-from django.shortcuts import render
-from .models import Group, Player, TeamPlayer, Event, Team, College, Sport, BasePayment, Transaction, BASE_PAYMENT_AMOUNT, SPORT_PAYMENT_AMOUNT, SportPayment
+from django.shortcuts import get_object_or_404, render
+from .models import Group, Player, TeamPlayer, Event, Team, College, BasePayment, Transaction, BASE_PAYMENT_AMOUNT, SPORT_PAYMENT_AMOUNT, SportPayment
 from django import forms
-from django.http import HttpResponseRedirect
-from .forms import PlayerRegistrationForm, UserRegistrationForm, PlayerLoginForm, SportsRegistrationForm, AdminLoginForm
+from django.http import Http404, HttpResponseBadRequest, HttpResponseRedirect
+from .forms import PlayerRegistrationForm, UserRegistrationForm, PlayerLoginForm, SportsRegistrationForm, AdminLoginForm, RosterImportForm
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import authenticate, login
+from django.contrib.auth import login
+from django.contrib.auth.forms import SetPasswordForm
 from .tables import TeamPlayerTable 
+from .pagination import encode_cursor, keyset_page, keyset_paginate, keyset_params, sort_choices, uuid_param
+from .stats import get_dashboard_stats, invalidate_dashboard_stats
+from .counters import lock_counter
+from .metrics import histogram
+from .routers import read_from_replica
+from .reference import cached_events_by_sport, cached_reference, fragment_version
+from .exports import PAYMENT_HEADER, PLAYER_COLUMNS, TEAM_COLUMNS, csv_response, payment_rows, player_rows, team_rows
+from .provisioning import check_activation_token
+from .roster_import import import_colleges, import_players
+from .payments import (
+    LocalGateway, PaymentCallbackError, complete_payment, expire_stale_payment, get_gateway, start_payment,
+)
+from .throttle import reset_short_circuit_counts, short_circuit_counts
 from django_tables2 import RequestConfig
+from django.conf import settings
 from django.contrib import messages
+import io
 import random
-from django.db.models import Count, Q, Prefetch
+import uuid
+from django.db.models import Count, Exists, OuterRef, Q, Prefetch
 from .models import UserProfile
 from collections import defaultdict
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import DEFAULT_DB_ALIAS, transaction as db_transaction
+from django.utils import timezone
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 ########################## AUTHENTICATION STUFF ############################
 
@@ -19,10 +43,10 @@ def register_player(request):
     if request.method == 'POST':
         form = UserRegistrationForm(request.POST)
         if form.is_valid():
-            form.save()
-            user = authenticate(request, username=form.data['email'], password=form.cleaned_data['password1'])
+            user = form.save()
             if user is not None:
-                login(request, user)
+                # create_user has just hashed the password, so skip authenticate()'s second hash
+                login(request, user, backend='django.contrib.auth.backends.ModelBackend')
                 userprof, created = UserProfile.objects.get_or_create(
                     auth_user=user,
                     defaults={
@@ -33,30 +57,48 @@ def register_player(request):
                     }
                 )
                 userprof.save()
-            return HttpResponseRedirect('/firewallz/player/details/')  # redirect to player dashboard
+                return HttpResponseRedirect('/firewallz/player/details/')  # redirect to player dashboard
     else:
         form = UserRegistrationForm()
     return render(request, 'register_player.html', {'form': form})
 
 
+def login_status(form):
+    # 429 once the login throttle refused the attempt
+    return 429 if form.has_error(NON_FIELD_ERRORS, code='throttled') else 200
+
 def login_player(request):
     if request.method == 'POST':
-        form = PlayerLoginForm(request.POST)
+        form = PlayerLoginForm(request.POST, request=request)
         if form.is_valid():
-            email = form.cleaned_data['email']
-            password = form.cleaned_data['password']
-            user = authenticate(request, username=email, password=password)
-            if user is None:
-                form.add_error(None, 'Invalid email or password.')
-            # Ensure that the user is a player not an admin
-            elif user.user_type != "player":
-                form.add_error(None, 'You are not authorized to login as a Player.')
-            else:
-                login(request, user)
-                return HttpResponseRedirect('/firewallz/player/dashboard/')
+            # The form has authenticated the player (and checked it is one)
+            login(request, form.cleaned_data['user'])
+            return HttpResponseRedirect('/firewallz/player/dashboard/')
     else:
         form = PlayerLoginForm()
-    return render(request, 'login_player.html', {'form': form})
+    return render(request, 'login_player.html', {'form': form}, status=login_status(form))
+
+def activate_account(request, profile_id, token):
+    # First login of a provisioned account: the one-time token stands in for the password,
+    # and the password the player picks here is the first one ever hashed for the account
+    profile = UserProfile.objects.select_related('auth_user').filter(pk=profile_id).first()
+    if not profile or not check_activation_token(profile, token):
+        return render(request, 'activate_account.html', {'invalid': True}, status=404)
+    user = profile.auth_user
+    if request.method == 'POST':
+        form = SetPasswordForm(user, request.POST)
+        if form.is_valid():
+            with db_transaction.atomic():
+                form.save()
+                profile.reg_token = None
+                profile.save(update_fields=['reg_token'])
+            login(request, user, backend='django.contrib.auth.backends.ModelBackend')
+            if Player.objects.filter(auth_user=user).exists():
+                return HttpResponseRedirect('/firewallz/player/dashboard/')
+            return HttpResponseRedirect('/firewallz/player/details/')
+    else:
+        form = SetPasswordForm(user)
+    return render(request, 'activate_account.html', {'form': form, 'email': user.email})
 
 def logout_player(request):
     request.session.flush()
@@ -64,7 +106,7 @@ def logout_player(request):
 
 def admin_login(request):
     if request.method == 'POST':
-        form = AdminLoginForm(request.POST)
+        form = AdminLoginForm(request.POST, request=request)
         if form.is_valid():
             try:
                 user = form.cleaned_data.get('user')
@@ -77,7 +119,7 @@ def admin_login(request):
                 form.add_error(f'An error occured while logging in {str(e)}')
     else:
         form = AdminLoginForm()
-    return render(request, 'admin_login.html', {'form': form})
+    return render(request, 'admin_login.html', {'form': form}, status=login_status(form))
 
 def admin_logout(request):
     request.session.flush()
@@ -139,7 +181,15 @@ def edit_profile(request):
 
 @login_required(login_url="/firewallz/player/login")
 def player_dashboard(request):
-    team_players = TeamPlayer.objects.filter(player__auth_user=request.user).select_related("team__captain", "team__college")
+    # Paid status is resolved for every TeamPlayer in the same query via an EXISTS subquery
+    paid_subquery = SportPayment.objects.filter(team_player=OuterRef('pk'), transaction_status='SUCCESS')
+    team_players = (
+        TeamPlayer.objects
+        .filter(player__auth_user=request.user)
+        .select_related("player__college", "team__captain", "team__college", "team__sport")
+        .prefetch_related(Prefetch("events", queryset=Event.objects.select_related("sport")))
+        .annotate(is_paid=Exists(paid_subquery))
+    )
     rows = []
     for team_player in team_players:
         for event in team_player.events.all():
@@ -151,7 +201,7 @@ def player_dashboard(request):
                 "college": team_player.player.college,
                 "sport": team_player.team.sport,
                 "status": team_player.status,
-                "is_paid": SportPayment.objects.filter(team_player=team_player, transaction_status='SUCCESS').exists(),
+                "is_paid": team_player.is_paid,
             })
     return render(request, 'player_dashboard.html', {'rows': rows})
 
@@ -189,84 +239,86 @@ def view_team_members(request, team_id):
 @login_required(login_url="/firewallz/player/login")
 def register_for_sports(request):
     player = Player.objects.filter(auth_user=request.user).first()
-    base_payment = BasePayment.objects.filter(player=player).first()
+    base_payment = BasePayment.objects.filter(player=player, transaction_status='SUCCESS').first()
     if not base_payment:
         return render(request, 'sports_registration.html', {'show_payment_button': True})
     if request.method == 'POST':
         form = SportsRegistrationForm(request.POST)
         if form.is_valid():
             selected_event = form.cleaned_data['sport']
-            if TeamPlayer.objects.filter(player=player, events__sport=selected_event).exists():
-                form.add_error(None, 'You are already enrolled in this sport.')
-                return render(request, 'sports_registration.html', {'form': form})
-            event = Event.objects.filter(sport=selected_event).first()
             if player.is_coach:
                 form.add_error(None, 'Coaches cannot register for sports as players.')
                 return render(request, 'sports_registration.html', {'form': form})
-            if not event:
-                event = Event.objects.create(sport=selected_event)
             if selected_event.gender != player.gender:
                 form.add_error(None, 'You cannot register for a sport with a different gender category.')
                 return render(request, 'sports_registration.html', {'form': form})
-            current_count = TeamPlayer.objects.filter(events=event, player__college=player.college).count()
+            event = next(iter(cached_events_by_sport().get(selected_event.pk, [])), None)
+            if not event:
+                event, created = Event.objects.get_or_create(sport=selected_event, name='')
 
-            if current_count >= selected_event.max_players:
-                form.add_error(None, 'Your college has already fulfilled the required number of participants for this sport.')
-            else:
-                
-                team, created = Team.objects.get_or_create(
-                    college=player.college,
-                    sport=selected_event
-                )
-                team.save()
-                team_player, created = TeamPlayer.objects.get_or_create(player=player, team=team,is_playing=True, status='pcr_approved')
-                team_player.events.add(event)
-                team_player.save()
-                team.save()
-                
-                
-                return HttpResponseRedirect('/firewallz/player/dashboard/')
+            error = None
+            try:
+                with db_transaction.atomic():
+                    # Holding the (college, event) counter row lock serializes concurrent sign-ups,
+                    # so the quota check and the enrollment below act as one unit
+                    counter = lock_counter("event", player.college_id, event.pk)
+                    if TeamPlayer.objects.filter(player=player, events__sport=selected_event).exists():
+                        error = 'You are already enrolled in this sport.'
+                    elif counter.count >= selected_event.max_players:
+                        error = 'Your college has already fulfilled the required number of participants for this sport.'
+                    else:
+                        team, created = Team.objects.get_or_create(
+                            college=player.college,
+                            sport=selected_event
+                        )
+                        team_player, created = TeamPlayer.objects.get_or_create(player=player, team=team,is_playing=True, status='pcr_approved')
+                        team_player.events.add(event)
+                        # Re-validate with the new event (event limit, gender); failure rolls everything back
+                        team_player.save()
+            except ValidationError as e:
+                error = ' '.join(e.messages)
+            if error:
+                form.add_error(None, error)
+                return render(request, 'sports_registration.html', {'form': form})
             return HttpResponseRedirect('/firewallz/player/dashboard/')
     else:
         form = SportsRegistrationForm()
 
     return render(request, 'sports_registration.html', {'form': form})
 
+def create_pending_transaction(player, amount):
+    ref_no = random.randint(10000000000000000, 99999999999999999)
+    return Transaction.objects.create(
+        paid_by=player,
+        paid_for=player,
+        amount=amount,
+        reference_no=str(ref_no),
+        type="PLAYER",
+    )
+
 @login_required(login_url="/firewallz/player/login")
 def make_base_payment(request):
     player = Player.objects.filter(auth_user=request.user).first()
     if not player:
         return HttpResponseRedirect('/firewallz/player/login/')
 
-    if BasePayment.objects.filter(player=player).exists():
-        return HttpResponseRedirect('/firewallz/player/sports_registration')
-    try:
-        ref_no=random.randint(10000000000000000, 99999999999999999)
-        transaction = Transaction.objects.create(
-            paid_by=player,
-            paid_for=player,
-            amount=BASE_PAYMENT_AMOUNT,
-            reference_no=str(ref_no),
-            type="PLAYER",
-        )
-        transaction.save()
-        payment, created = BasePayment.objects.get_or_create(player=player, transaction=transaction)
-        if transaction:
-            # Check if the transaction is successful or not
-            payment.transaction_status = "SUCCESS"
-            transaction.status = "SUCCESS"
-            if hasattr(payment, 'transaction'):
-                payment.transaction = transaction
-            payment.save()
-            return HttpResponseRedirect('/firewallz/player/sports_registration/')
-        else:
-            # Transaction creation failed -->>> mark payment as failed and show an error
-            payment.transaction_status = "FAILED"
-            if hasattr(payment, 'transaction'):
-                payment.transaction = None
-            payment.save()
-            messages.error(request, 'Transaction failed. Please try again.')
+    payments = BasePayment.objects.filter(player=player).select_related('transaction')
+    if payments.filter(transaction_status="SUCCESS").exists():
+        return HttpResponseRedirect('/firewallz/player/sports_registration/')
+    pending = payments.filter(transaction_status="PENDING").first()
+    if pending:
+        transaction = expire_stale_payment(pending.transaction)
+        if transaction.status == "PENDING":
+            # Resume the checkout already in progress rather than charging twice
+            return HttpResponseRedirect(transaction.payment_url)
+        if transaction.status == "SUCCESS":
             return HttpResponseRedirect('/firewallz/player/sports_registration/')
+    try:
+        with db_transaction.atomic():
+            transaction = create_pending_transaction(player, BASE_PAYMENT_AMOUNT)
+            BasePayment.objects.create(player=player, transaction=transaction)
+            # The gateway reports the outcome to payment_callback; nothing waits on it here
+            return HttpResponseRedirect(start_payment(transaction))
     except Exception as e:
         messages.error(request, str(e))
         return HttpResponseRedirect('/firewallz/player/sports_registration/')
@@ -283,6 +335,17 @@ def make_sports_payment(request, tp_id):
         messages.error(request, "Team player not found or you don't have permission.")
         return HttpResponseRedirect('/firewallz/player/dashboard/')
 
+    payments = SportPayment.objects.filter(team_player=team_player).select_related('transaction')
+    if payments.filter(transaction_status="SUCCESS").exists():
+        return HttpResponseRedirect(reverse('print_receipt', args=[team_player.pk]))
+    pending = payments.filter(transaction_status="PENDING").first()
+    if pending:
+        transaction = expire_stale_payment(pending.transaction)
+        if transaction.status == "PENDING":
+            return HttpResponseRedirect(transaction.payment_url)
+        if transaction.status == "SUCCESS":
+            return HttpResponseRedirect(reverse('print_receipt', args=[team_player.pk]))
+
     events_count = team_player.events.count()
     if events_count == 0:
         messages.error(request, "No events registered for this team player.")
@@ -291,40 +354,65 @@ def make_sports_payment(request, tp_id):
     total_amount = events_count * SPORT_PAYMENT_AMOUNT
 
     try:
-        ref_no = random.randint(10000000000000000, 99999999999999999)
-        transaction = Transaction.objects.create(
-            paid_by=player,
-            paid_for=player,
-            amount=total_amount,
-            reference_no=str(ref_no),
-            type="PLAYER",
-        )
-        transaction.status = "SUCCESS"
-        transaction.save()
-
-        # Create SportPayment tied to this TeamPlayer and transaction
-        sport_payment, created = SportPayment.objects.get_or_create(
-            team_player=team_player,
-            transaction=transaction,
-            amount=total_amount,
-        )
-        if transaction.status == "SUCCESS":
-            sport_payment.transaction_status = 'SUCCESS'
-            sport_payment.save()
-
-        context = {
-            "amount": total_amount,
-            "transaction_ref": transaction.reference_no,
-            "transaction_id": transaction.id,
-            "team_player_id": team_player.id,
-            "events_count": events_count,
-            "sport_payment_id": sport_payment.id,
-        }
-        return render(request, "process_payment.html", context)
+        with db_transaction.atomic():
+            transaction = create_pending_transaction(player, total_amount)
+            SportPayment.objects.create(team_player=team_player, transaction=transaction, amount=total_amount)
+            return HttpResponseRedirect(start_payment(transaction))
     except Exception as e:
         messages.error(request, str(e))
         return HttpResponseRedirect('/firewallz/player/dashboard/')
-    
+
+@login_required(login_url="/firewallz/player/login")
+def payment_status(request, transaction_id):
+    player = Player.objects.filter(auth_user=request.user).first()
+    if not player:
+        return HttpResponseRedirect('/firewallz/player/login/')
+
+    transaction = Transaction.objects.filter(pk=transaction_id, paid_by=player).first()
+    if not transaction:
+        messages.error(request, "Transaction not found.")
+        return HttpResponseRedirect('/firewallz/player/dashboard/')
+    transaction = expire_stale_payment(transaction)
+
+    if transaction.base_payment.exists():
+        redirect_url = reverse('sports_registration')
+    else:
+        redirect_url = reverse('player_dashboard')
+    context = {
+        "transaction": transaction,
+        "total_amount": transaction.amount,
+        "redirect_url": redirect_url,
+    }
+    return render(request, "process_payment.html", context)
+
+@csrf_exempt
+@require_POST
+def payment_callback(request):
+    # Called by the payment gateway (or, for redirect-based gateways, the player's
+    # browser), so it is authenticated by the gateway's signature instead of a session
+    gateway = get_gateway()
+    try:
+        transaction = complete_payment(*gateway.parse_callback(request))
+    except PaymentCallbackError as e:
+        return HttpResponseBadRequest(str(e))
+    return gateway.callback_response(transaction)
+
+def local_gateway_checkout(request, reference_no):
+    if not settings.LOCAL_PAYMENT_GATEWAY_ENABLED:
+        raise Http404("The local payment gateway is not enabled.")
+    gateway = get_gateway()
+    if not isinstance(gateway, LocalGateway):
+        raise Http404("The local payment gateway is not enabled.")
+    transaction = Transaction.objects.filter(reference_no=reference_no).first()
+    if not transaction:
+        raise Http404("Transaction not found.")
+    context = {
+        "transaction": transaction,
+        "success_payload": gateway.sign(transaction, "SUCCESS"),
+        "failed_payload": gateway.sign(transaction, "FAILED"),
+    }
+    return render(request, "local_gateway_checkout.html", context)
+
 @login_required(login_url="/firewallz/player/login")
 def print_receipt(request, team_player_id):
 
@@ -338,7 +426,12 @@ def print_receipt(request, team_player_id):
         messages.error(request, "Team player not found or you don't have permission.")
         return HttpResponseRedirect('/firewallz/player/dashboard/')
 
-    sport_payment = SportPayment.objects.filter(team_player=team_player, transaction_status='SUCCESS').first()
+    sport_payment = (
+        SportPayment.objects
+        .filter(team_player=team_player, transaction_status='SUCCESS')
+        .select_related('transaction__paid_by')
+        .first()
+    )
     if not sport_payment:
         messages.error(request, "No successful payment found for this team player.")
         return HttpResponseRedirect('/firewallz/player/dashboard/')
@@ -354,108 +447,178 @@ def print_receipt(request, team_player_id):
 
 ######################### FIREWALLZ ADMIN FUNCTIONALITY ##########################
 
+def admin_only(request):
+    if request.user.user_type != "admin":
+        messages.error(request, "You do not have admin access.")
+        return HttpResponseRedirect('/firewallz/admin/login/')
+    return None
+
+
+# Fields the admin listings may be sorted (and keyset paginated) on
+PLAYER_SORT_FIELDS = ('name', 'created_at')
+TEAM_SORT_FIELDS = ('team_code', 'created_at')
+COLLEGE_SORT_FIELDS = ('name', 'created_at')
+GROUP_SORT_FIELDS = ('name', 'created_at')
+
+def filter_players(request, players):
+    # ?college=<id>&q=<name or email>, shared by the player listings and their export
+    college_id = uuid_param(request, 'college')
+    if college_id:
+        players = players.filter(college_id=college_id)
+    query = request.GET.get('q', '').strip()
+    if query:
+        players = players.filter(Q(name__icontains=query) | Q(email__icontains=query))
+    return players
+
+def filter_teams(request, teams):
+    college_id = uuid_param(request, 'college')
+    if college_id:
+        teams = teams.filter(college_id=college_id)
+    sport_id = uuid_param(request, 'sport')
+    if sport_id:
+        teams = teams.filter(sport_id=sport_id)
+    verified = request.GET.get('verified')
+    if verified in ('0', '1'):
+        teams = teams.filter(is_verified_by_firewallz=verified == '1')
+    query = request.GET.get('q', '').strip()
+    if query:
+        teams = teams.filter(team_code__icontains=query)
+    return teams
+
 @login_required(login_url="/firewallz/admin/login")
+@read_from_replica
 def admin_dashboard(request):
-    # TeamPlayer now only holds players (not coaches)
-    team_player_stats = TeamPlayer.objects.aggregate(
-        pcr_approved_players=Count('static_id', filter=Q(player__status='pcr_confirmed')),
-        firewallz_approved_players=Count('static_id', filter=Q(player__verified_by_firewallz=True)),
-    )
-    pcr_approved_players = team_player_stats.get('pcr_approved_players', 0)
-    firewallz_approved_players = team_player_stats.get('firewallz_approved_players', 0)
-
-    player_stats = Player.objects.aggregate(
-        total_players=Count('static_id', filter=Q(is_coach=False)),
-        total_coaches=Count('static_id', filter=Q(is_coach=True)),
-        firewallz_approved_coaches=Count('static_id', filter=Q(is_coach=True, verified_by_firewallz=True))
-    )
-    total_players = player_stats.get('total_players', 0)
-    total_teams = Team.objects.aggregate(total_teams=Count('static_id')).get('total_teams', 0)
-    total_colleges = College.objects.aggregate(total_colleges=Count('static_id')).get('total_colleges', 0)
-    pcr_approved_coaches = Player.objects.filter(is_coach=True, status='pcr_confirmed').count()
-    firewallz_approved_coaches = player_stats.get('firewallz_approved_coaches', 0)
+    # Counters are served from a short-TTL cache that model signals invalidate
+    stats = get_dashboard_stats()
     context = {
-        'total_players': total_players,
-        'total_teams': total_teams,
-        'total_colleges': total_colleges,
-        'pcr_approved_players': pcr_approved_players,
-        'pcr_approved_coaches': pcr_approved_coaches,
-        'firewallz_approved_players': firewallz_approved_players,
-        'firewallz_approved_coaches': firewallz_approved_coaches,
-        'total_coaches': player_stats.get('total_coaches', 0),
+        'total_players': stats['total_players'],
+        'total_teams': stats['total_teams'],
+        'total_colleges': stats['total_colleges'],
+        'pcr_approved_players': stats['pcr_approved_players'],
+        'pcr_approved_coaches': stats['pcr_approved_coaches'],
+        'firewallz_approved_players': stats['firewallz_approved_players'],
+        'firewallz_approved_coaches': stats['firewallz_approved_coaches'],
+        'total_coaches': stats['total_coaches'],
     }
     return render(request, 'admin_dashboard.html', context)
 
 @login_required(login_url="/firewallz/admin/login")
+@read_from_replica
 def pcr_approved_players(request):
-    team_players = TeamPlayer.objects.filter(status='pcr_approved', player__is_coach=False)
-    approved_teamplayers = []
+    # Paginate over distinct players, then pick each one's first approved TeamPlayer
+    approved = TeamPlayer.objects.filter(player=OuterRef('pk'), status='pcr_approved')
+    players = filter_players(request, Player.objects.filter(Exists(approved), is_coach=False))
+    page = keyset_paginate(request, players, PLAYER_SORT_FIELDS, 'name')
+
+    team_players = (
+        TeamPlayer.objects
+        .filter(status='pcr_approved', player__in=[player.pk for player in page])
+        .select_related('player__college', 'team__sport')
+        .order_by('created_at')
+    )
+    # Keep the first approved TeamPlayer of every player, keyed on player_id
+    approved_teamplayers = {}
     for team_player in team_players:
-        if any(team_player.player == player.player for player in approved_teamplayers):
-            continue
-        approved_teamplayers.append(team_player)
-    return render(request,"pcr_approved_players.html",{"team_players": approved_teamplayers})
+        approved_teamplayers.setdefault(team_player.player_id, team_player)
+    rows = [approved_teamplayers[player.pk] for player in page if player.pk in approved_teamplayers]
+    return render(request, "pcr_approved_players.html", {
+        "team_players": rows,
+        "page": page,
+        "sort_choices": sort_choices(PLAYER_SORT_FIELDS),
+    })
     # Coaches are no longer TeamPlayers; show all coaches (adjust if a PCR flag is later added)
 
 @login_required(login_url="/firewallz/admin/login")
-def pcr_approved_coaches(request):    
-    
-    approved_coaches = Player.objects.filter(is_coach=True, status='pcr_confirmed')
-    payments = BasePayment.objects.filter(player__in=approved_coaches)
-    payment_statuses = []
-    for payment in payments:
-        if payment is None:
-            payment_statuses.append(False)
-        else: 
-            payment_statuses.append(True)
-    return render(request, 'pcr_approved_coaches.html', {'approved_coaches': approved_coaches, 'payment_statuses': payment_statuses})
+@read_from_replica
+def pcr_approved_coaches(request):
+    # Payment status comes from an EXISTS subquery instead of a list zipped against the coaches
+    approved_coaches = (
+        Player.objects
+        .filter(is_coach=True, status='pcr_confirmed')
+        .select_related('college')
+        .annotate(is_paid=Exists(BasePayment.objects.filter(player=OuterRef('pk'), transaction_status='SUCCESS')))
+        .order_by('name', 'pk')
+    )
+    return render(request, 'pcr_approved_coaches.html', {'approved_coaches': approved_coaches})
 
 @login_required(login_url="/firewallz/admin/login")
+@read_from_replica
 def firewallz_approved_players(request):
-    players = Player.objects.filter(verified_by_firewallz = True, is_coach=False)
-    teams_data = list()
-    for player in players:
-        teams = TeamPlayer.objects.filter(player=player)
-        teams_data.append(teams)
-        
-    return render(request, 'firewallz_approved_players.html', {'players': players, 'team_list': teams_data})
+    players = (
+        Player.objects
+        .filter(verified_by_firewallz=True, is_coach=False)
+        .select_related('college')
+        .prefetch_related(
+            Prefetch(
+                'team_players',
+                queryset=TeamPlayer.objects.select_related('team__sport'),
+                to_attr='prefetched_teamplayers'
+            )
+        )
+    )
+    return render(request, 'firewallz_approved_players.html', {'players': players})
 @login_required(login_url="/firewallz/admin/login")
+@read_from_replica
 def firewallz_approved_coaches(request):
     approved_coaches = (
         Player.objects
         .filter(is_coach=True, verified_by_firewallz=True)
         .select_related('college', 'auth_user')
-        .order_by('college__name', 'name')
     )
-    return render(request, 'firewallz_approved_coaches.html', {'approved_coaches': approved_coaches})
+    approved_coaches = filter_players(request, approved_coaches)
+    page = keyset_paginate(request, approved_coaches, PLAYER_SORT_FIELDS, 'name')
+    return render(request, 'firewallz_approved_coaches.html', {
+        'approved_coaches': page,
+        'page': page,
+        'sort_choices': sort_choices(PLAYER_SORT_FIELDS),
+    })
 @login_required(login_url="/firewallz/admin/login")
+@read_from_replica
 def team_list(request):
-    # TeamPlayer now only stores actual players (not coaches)
-    teamplayer_accessor = TeamPlayer._meta.get_field('team').remote_field.get_accessor_name()
-    teams = (
-        Team.objects
-        .select_related('college', 'sport', 'captain')
-        .prefetch_related(
-            Prefetch(
-                teamplayer_accessor,
-                queryset=TeamPlayer.objects.select_related('player').filter(player__is_coach=False),
-                to_attr='all_teamplayers'
-            ),
-        )
-    )
-    for team in teams:
+    # The listing shows no members, so none are prefetched
+    teams = filter_teams(request, Team.objects.select_related('college', 'sport', 'captain'))
+    page = keyset_paginate(request, teams, TEAM_SORT_FIELDS, 'team_code')
+    for team in page:
         team.coaches = []  # Coaches no longer linked via TeamPlayer
-    return render(request, 'team_list.html', {'teams': teams})
+    return render(request, 'team_list.html', {
+        'teams': page,
+        'rows_version': fragment_version('team_list.html', page, 'college', 'sport', 'captain'),
+        'page': page,
+        'sort_choices': sort_choices(TEAM_SORT_FIELDS),
+        'export_url': reverse('export_teams'),
+    })
 
 @login_required(login_url="/firewallz/admin/login")
+@read_from_replica
 def college_list(request):
-    colleges = College.objects.all().order_by('name')
-    return render(request, 'college_list.html', {'colleges': colleges})
+    colleges = College.objects.select_related('representative__college')
+    query = request.GET.get('q', '').strip()
+    if query:
+        colleges = colleges.filter(Q(name__icontains=query) | Q(letter_code__iexact=query))
+    sort, cursor, page_size = keyset_params(request, colleges, COLLEGE_SORT_FIELDS, 'name')
+    position = encode_cursor(*cursor) if cursor else ''
+    # Pages are cached per validated position until a college (or its representative)
+    # changes. They are read from the primary: a lagging replica would otherwise get its
+    # pre-write rows cached under the version the write has just bumped.
+    page = cached_reference(
+        "colleges",
+        lambda: keyset_page(colleges.using(DEFAULT_DB_ALIAS), sort, cursor, page_size),
+        name=f"college_list?{urlencode({'q': query, 'sort': sort, 'cursor': position, 'page_size': page_size})}",
+    )
+    return render(request, 'college_list.html', {
+        'colleges': page,
+        'page': page,
+        'sort_choices': sort_choices(COLLEGE_SORT_FIELDS),
+    })
 
 @login_required(login_url="/firewallz/admin/login")
+@read_from_replica
 def players_per_college(request, college_id):
     try:
-        college = College.objects.get(pk=college_id)
+        # The player total is folded into the college lookup instead of a separate COUNT
+        college = College.objects.annotate(
+            player_count=Count('players', filter=Q(players__is_coach=False, players__is_deleted=False))
+        ).get(pk=college_id)
     except College.DoesNotExist:
         messages.error(request, "College not found.")
         return HttpResponseRedirect('/firewallz/admin/colleges/')
@@ -463,18 +626,35 @@ def players_per_college(request, college_id):
         Player.objects
         .filter(college=college, is_coach=False)
         .select_related('college', 'auth_user')
-        .order_by('name')
     )
+    query = request.GET.get('q', '').strip()
+    if query:
+        players = players.filter(Q(name__icontains=query) | Q(email__icontains=query))
+    page = keyset_paginate(request, players, PLAYER_SORT_FIELDS, 'name')
     return render(request, 'players_per_college.html', {
         'college': college,
-        'players': players,
-        'player_count': players.count(),
+        'players': page,
+        'player_count': college.player_count,
+        'page': page,
+        'sort_choices': sort_choices(PLAYER_SORT_FIELDS),
+        'export_url': f"{reverse('export_players')}?college={college.pk}&coach=0",
     })
 
 @login_required(login_url="/firewallz/admin/login")
 def group_list(request):
-    groups = Group.objects.all()
-    return render(request, 'group_list.html', {'groups': groups})
+    groups = Group.objects.select_related('college').annotate(member_count=Count('players'))
+    college_id = uuid_param(request, 'college')
+    if college_id:
+        groups = groups.filter(college_id=college_id)
+    query = request.GET.get('q', '').strip()
+    if query:
+        groups = groups.filter(name__icontains=query)
+    page = keyset_paginate(request, groups, GROUP_SORT_FIELDS, 'name')
+    return render(request, 'group_list.html', {
+        'groups': page,
+        'page': page,
+        'sort_choices': sort_choices(GROUP_SORT_FIELDS),
+    })
 
 @login_required(login_url="/firewallz/admin/login")
 def create_group(request):
@@ -495,6 +675,9 @@ def create_group(request):
 
 @login_required(login_url="/firewallz/admin/login")
 def approve_player(request, player_id):
+    denied = admin_only(request)
+    if denied:
+        return denied
     try:
         player = Player.objects.get(pk=player_id)
         if player.verified_by_firewallz != True:
@@ -507,28 +690,90 @@ def approve_player(request, player_id):
         messages.error(request, "Player not found.")
     return HttpResponseRedirect('/firewallz/admin/firewallz_approved_players/')
 
+@login_required(login_url="/firewallz/admin/login")
+def approve_players(request):
+    """
+    Marks every selected player as verified by firewallz with a single UPDATE.
+    Players that are missing or not PCr confirmed are reported back individually.
+    """
+    denied = admin_only(request)
+    if denied:
+        return denied
+    if request.method != 'POST':
+        return HttpResponseRedirect('/firewallz/admin/pcr_approved_players/')
+    player_ids = set()
+    for raw_id in request.POST.getlist('player_ids'):
+        try:
+            player_ids.add(uuid.UUID(raw_id))
+        except ValueError:
+            messages.error(request, f"Invalid player id {raw_id}.")
+    if not player_ids:
+        messages.error(request, "No players selected.")
+        return HttpResponseRedirect('/firewallz/admin/pcr_approved_players/')
+
+    players = {
+        pk: (name, status, verified)
+        for pk, name, status, verified in Player.objects.filter(pk__in=player_ids)
+        .values_list('pk', 'name', 'status', 'verified_by_firewallz')
+    }
+    eligible = []
+    for player_id in player_ids:
+        if player_id not in players:
+            messages.error(request, f"Player {player_id} not found.")
+            continue
+        name, status, verified = players[player_id]
+        if verified:
+            messages.info(request, f"Player {name} is already approved.")
+        # Same rule as Player.clean: only confirmed players may be verified
+        elif status == 'pcr_unconfirmed':
+            messages.error(request, f"Cannot approve {name}: player is not PCr confirmed.")
+        else:
+            eligible.append(player_id)
+
+    if eligible:
+        with db_transaction.atomic():
+            approved = (
+                Player.objects
+                .filter(pk__in=eligible, verified_by_firewallz=False)
+                .exclude(status='pcr_unconfirmed')
+                .update(verified_by_firewallz=True, updated_at=timezone.now())
+            )
+        # queryset.update() does not send post_save
+        invalidate_dashboard_stats()
+        messages.success(request, f"Approved {approved} player(s).")
+    return HttpResponseRedirect('/firewallz/admin/pcr_approved_players/')
+
 @login_required(login_url="/firewallz/admin/login")
 def view_team_members_admin(request, team_id):
     try:
-        team = Team.objects.get(pk=team_id)
+        team = Team.objects.select_related('college').get(pk=team_id)
     except Team.DoesNotExist:
         messages.error(request, "Team not found.")
         return HttpResponseRedirect('/firewallz/admin/teams/')
-    team_players = TeamPlayer.objects.filter(team=team)
+    team_players = TeamPlayer.objects.filter(team=team).select_related('player')
     return render(request, 'view_team_members_admin.html', {'team': team, 'team_players': team_players})
 
+def unverified_members(team_ref):
+    """
+    TeamPlayers of the given team (a Team or an OuterRef to one) whose player
+    has not been verified by firewallz yet
+    """
+    return TeamPlayer.objects.filter(team=team_ref, player__verified_by_firewallz=False)
+
 @login_required(login_url="/firewallz/admin/login")
 def approve_team(request, team_id):
+    denied = admin_only(request)
+    if denied:
+        return denied
     try:
-        team = Team.objects.get(pk=team_id)
+        team = Team.objects.select_related('college', 'sport').get(pk=team_id)
         if team.is_verified_by_firewallz != True:
-            team_players = TeamPlayer.objects.filter(team=team)
-            for team_player in team_players:
-                if team_player.player.verified_by_firewallz != True:
-                    messages.error(request, f"Cannot approve team. Player {team_player.player.name} is not approved yet.")
+            with db_transaction.atomic():
+                unverified_name = unverified_members(team).values_list('player__name', flat=True).first()
+                if unverified_name is not None:
+                    messages.error(request, f"Cannot approve team. Player {unverified_name} is not approved yet.")
                     return  HttpResponseRedirect('/firewallz/admin/teams/')
-            team.is_verified_by_firewallz = True
-            team.save()
+                Team.objects.filter(pk=team.pk).update(is_verified_by_firewallz=True, updated_at=timezone.now())
             messages.success(request, f"Team for {team.college.name} - {team.sport.name} approved successfully.")
         else:
             messages.info(request, f"Team for {team.college.name} - {team.sport.name} is already approved.")
@@ -538,10 +783,60 @@ def approve_team(request, team_id):
     return HttpResponseRedirect("/firewallz/admin/teams/")
 
 @login_required(login_url="/firewallz/admin/login")
+def approve_teams(request):
+    """
+    Approves every pending team of a college (or an explicit list of team ids) in a
+    constant number of statements. Teams that still have unverified members are skipped.
+    """
+    denied = admin_only(request)
+    if denied:
+        return denied
+    if request.method != 'POST':
+        return HttpResponseRedirect('/firewallz/admin/teams/')
+    college_id = request.POST.get('college_id')
+    team_ids = request.POST.getlist('team_ids')
+    if not college_id and not team_ids:
+        messages.error(request, "Select a college or at least one team to approve.")
+        return HttpResponseRedirect('/firewallz/admin/teams/')
+
+    teams = Team.objects.filter(is_verified_by_firewallz=False)
+    try:
+        if college_id:
+            teams = teams.filter(college_id=college_id)
+        if team_ids:
+            teams = teams.filter(pk__in=team_ids)
+        with db_transaction.atomic():
+            blocked = list(
+                teams.filter(Exists(unverified_members(OuterRef('pk'))))
+                .order_by('team_code')
+                .values_list('team_code', flat=True)
+            )
+            approved = (
+                teams.filter(~Exists(unverified_members(OuterRef('pk'))))
+                .update(is_verified_by_firewallz=True, updated_at=timezone.now())
+            )
+    except ValidationError:
+        messages.error(request, "Invalid college or team id.")
+        return HttpResponseRedirect('/firewallz/admin/teams/')
+
+    if approved:
+        messages.success(request, f"Approved {approved} team(s).")
+    if blocked:
+        messages.error(request, f"Skipped teams with unapproved players: {', '.join(blocked)}")
+    if not approved and not blocked:
+        messages.info(request, "No pending teams to approve.")
+    return HttpResponseRedirect('/firewallz/admin/teams/')
+
+@login_required(login_url="/firewallz/admin/login")
+@require_POST
 def mark_player_as_paid(request, player_id):
-    player = Player.objects.get(pk=player_id)
+    # Records a payment without the gateway, so only admins may do it
+    denied = admin_only(request)
+    if denied:
+        return denied
+    player = get_object_or_404(Player, pk=player_id)
 
-    if BasePayment.objects.filter(player=player).exists():
+    if BasePayment.objects.filter(player=player, transaction_status="SUCCESS").exists():
         messages.info(request, f"Base payment already exists for {player.name}.")
         if player.is_coach:
             return HttpResponseRedirect('/firewallz/admin/pcr_approved_coaches/')
@@ -571,5 +866,85 @@ def mark_player_as_paid(request, player_id):
     else:
         return HttpResponseRedirect('/firewallz/admin/pcr_approved_players/')
 
+########################## EXPORTS ############################
+
+@login_required(login_url="/firewallz/admin/login")
+@read_from_replica
+def export_players(request):
+    denied = admin_only(request)
+    if denied:
+        return denied
+    players = filter_players(request, Player.objects.all())
+    for param, field in (('coach', 'is_coach'), ('verified', 'verified_by_firewallz')):
+        if request.GET.get(param) in ('0', '1'):
+            players = players.filter(**{field: request.GET[param] == '1'})
+    players = players.order_by('name', 'pk')
+    return csv_response("players.csv", [label for _, label in PLAYER_COLUMNS], player_rows(players))
+
+@login_required(login_url="/firewallz/admin/login")
+@read_from_replica
+def export_teams(request):
+    denied = admin_only(request)
+    if denied:
+        return denied
+    teams = filter_teams(request, Team.objects.all()).order_by('team_code', 'pk')
+    header = [label for _, label in TEAM_COLUMNS] + ["Members"]
+    return csv_response("teams.csv", header, team_rows(teams))
+
+@login_required(login_url="/firewallz/admin/login")
+@read_from_replica
+def export_payments(request):
+    denied = admin_only(request)
+    if denied:
+        return denied
+    base_payments = BasePayment.objects.all()
+    sport_payments = SportPayment.objects.all()
+    college_id = uuid_param(request, 'college')
+    if college_id:
+        base_payments = base_payments.filter(player__college_id=college_id)
+        sport_payments = sport_payments.filter(team_player__team__college_id=college_id)
+    status = request.GET.get('status')
+    if status:
+        base_payments = base_payments.filter(transaction_status=status)
+        sport_payments = sport_payments.filter(transaction_status=status)
+    base_payments = base_payments.order_by('created_at', 'pk')
+    sport_payments = sport_payments.order_by('created_at', 'pk')
+    return csv_response("payments.csv", PAYMENT_HEADER, payment_rows(base_payments, sport_payments))
+
+########################## IMPORTS ############################
+
+@login_required(login_url="/firewallz/admin/login")
+def import_roster(request):
+    denied = admin_only(request)
+    if denied:
+        return denied
+    report = None
+    if request.method == 'POST':
+        form = RosterImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            importer = import_players if form.cleaned_data['kind'] == 'players' else import_colleges
+            try:
+                report = importer(io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline=''))
+            except (UnicodeDecodeError, ValueError) as e:
+                form.add_error('file', str(e))
+    else:
+        form = RosterImportForm()
+    return render(request, 'import_roster.html', {'form': form, 'report': report})
+
+@login_required(login_url="/firewallz/admin/login")
+def request_metrics(request):
+    if request.user.user_type != "admin":
+        messages.error(request, "You do not have admin access.")
+        return HttpResponseRedirect('/firewallz/admin/login/')
+    if request.method == 'POST':
+        histogram.clear()
+        reset_short_circuit_counts()
+        return HttpResponseRedirect('/firewallz/admin/metrics/')
+    return render(request, 'request_metrics.html', {
+        'rows': histogram.summary(),
+        'window': histogram.window,
+        'short_circuited': short_circuit_counts(),
+    })
+
 def home(request):
     return render(request, 'home.html')
\ No newline at end of file
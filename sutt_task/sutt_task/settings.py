@@ -12,7 +12,12 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
+from django.conf import global_settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .database import database_from_url
 
 load_dotenv()
 
@@ -27,9 +32,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv('DJANGO_SECRET_KEY')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv('DJANGO_DEBUG', 'True').lower() in ('1', 'true', 'yes')
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.getenv('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -47,23 +52,34 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = 'firewallz.CustomBaseUser'
 
+# EmailBackend serves authenticate(email=...) from the player login; everything passing a
+# username (the admin login, the Django admin) goes to ModelBackend
+AUTHENTICATION_BACKENDS = [
+    'firewallz.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 MIDDLEWARE = [
+    'firewallz.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'firewallz.routers.PinPrimaryAfterWriteMiddleware',
 ]
 
 ROOT_URLCONF = 'sutt_task.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates plus render timing for the request metrics middleware
+        'BACKEND': 'firewallz.metrics.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'firewallz/templates')],
-        'APP_DIRS': True,
+        'APP_DIRS': DEBUG,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
@@ -74,19 +90,58 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    # Parse every template once per process instead of leaving it to the defaults
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'sutt_task.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Read from DATABASE_URL (sqlite:// or postgres://), falling back to the local SQLite file.
+# PostgreSQL uses persistent connections (DB_CONN_MAX_AGE) or, with DB_POOL=1, psycopg's pool.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_from_url(
+        os.getenv('DATABASE_URL', 'sqlite:///db.sqlite3'), BASE_DIR
+    ),
 }
 
+# Optional read replica for the admin reporting views (see firewallz.routers). Tests use
+# the primary in its place. Two SQLite files work as a local stand-in.
+if os.getenv('REPLICA_DATABASE_URL'):
+    DATABASES['replica'] = database_from_url(os.getenv('REPLICA_DATABASE_URL'), BASE_DIR)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['firewallz.routers.ReplicaRouter']
+
+# Seconds a client keeps reading from the primary after it writes, to hide replica lag
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 10))
+
+
+# Password hashing. PASSWORD_HASHER picks the hasher for new passwords per environment;
+# the rest of Django's defaults stay listed so existing hashes keep verifying and are
+# upgraded at the next login. argon2 needs argon2-cffi and bcrypt needs bcrypt installed.
+# md5 is for test and benchmark runs only and is refused when DEBUG is off.
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'md5': 'django.contrib.auth.hashers.MD5PasswordHasher',
+}
+PASSWORD_HASHER = PASSWORD_HASHER_CHOICES[os.getenv('PASSWORD_HASHER', 'pbkdf2')]
+if not DEBUG and PASSWORD_HASHER == PASSWORD_HASHER_CHOICES['md5']:
+    raise ImproperlyConfigured('PASSWORD_HASHER=md5 is for tests only; pick another hasher when DEBUG is off.')
+PASSWORD_HASHERS = [PASSWORD_HASHER] + [
+    hasher for hasher in global_settings.PASSWORD_HASHERS if hasher != PASSWORD_HASHER
+]
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,6 +178,83 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = os.getenv('STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+# WhiteNoise serves the files itself. Outside DEBUG, collectstatic writes content-hashed
+# copies with gzip and brotli variants next to them, and hashed names are sent with
+# far-future immutable cache headers.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+        else 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+# Pinned to the settings-time DEBUG: the test runner turns DEBUG off, and WhiteNoise would
+# then look for a collected STATIC_ROOT that development checkouts do not have
+WHITENOISE_AUTOREFRESH = DEBUG
+
+# Dotted path of the payment gateway client (a firewallz.payments.PaymentGateway).
+# LocalGateway settles any payment on an unauthenticated local checkout page, so it is
+# the default in DEBUG only, and production must name a real provider.
+LOCAL_PAYMENT_GATEWAY = 'firewallz.payments.LocalGateway'
+PAYMENT_GATEWAY = os.getenv('PAYMENT_GATEWAY', LOCAL_PAYMENT_GATEWAY if DEBUG else '')
+if not DEBUG and PAYMENT_GATEWAY in ('', LOCAL_PAYMENT_GATEWAY):
+    raise ImproperlyConfigured('Set PAYMENT_GATEWAY to a real payment gateway when DEBUG is off.')
+# Pinned to the settings-time DEBUG for the same reason as WHITENOISE_AUTOREFRESH
+LOCAL_PAYMENT_GATEWAY_ENABLED = DEBUG
+# Seconds a signed gateway callback stays valid
+PAYMENT_CALLBACK_MAX_AGE = int(os.getenv('PAYMENT_CALLBACK_MAX_AGE', 3600))
+
+# Cache backend: "locmem" (per process, the default), "file" (shared by every process on
+# the host through CACHE_LOCATION) or "redis" (CACHE_LOCATION is the server URL and the
+# redis package must be installed)
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'firewallz_cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+elif CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', 'redis://127.0.0.1:6379'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'firewallz',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Seconds cached colleges, sports and events live; saves invalidate them earlier
+REFERENCE_DATA_CACHE_TTL = int(os.getenv('REFERENCE_DATA_CACHE_TTL', 3600))
+
+# Seconds the admin dashboard counters stay cached; model signals invalidate them earlier
+DASHBOARD_STATS_CACHE_TTL = int(os.getenv('DASHBOARD_STATS_CACHE_TTL', 30))
+
+# Samples kept per URL name in the in-process request metrics histogram
+REQUEST_METRICS_WINDOW = int(os.getenv('REQUEST_METRICS_WINDOW', 500))
+
+# Failed logins allowed per client IP and per account within a sliding window of
+# LOGIN_THROTTLE_WINDOW seconds; further attempts are refused without a password check
+LOGIN_THROTTLE_WINDOW = int(os.getenv('LOGIN_THROTTLE_WINDOW', 300))
+LOGIN_THROTTLE_IP_LIMIT = int(os.getenv('LOGIN_THROTTLE_IP_LIMIT', 50))
+LOGIN_THROTTLE_ACCOUNT_LIMIT = int(os.getenv('LOGIN_THROTTLE_ACCOUNT_LIMIT', 5))
+# request.META key holding the client address for the per-IP limit. The default,
+# 'REMOTE_ADDR', is right when clients connect directly. Behind a reverse proxy every
+# client shares the proxy's REMOTE_ADDR, so set this to the header the proxy writes
+# (e.g. 'HTTP_X_REAL_IP'), or to 'HTTP_X_FORWARDED_FOR' with the number of proxies in
+# LOGIN_THROTTLE_TRUSTED_PROXIES. Setting it to an empty string turns the per-IP limit off.
+LOGIN_THROTTLE_IP_HEADER = os.getenv('LOGIN_THROTTLE_IP_HEADER', 'REMOTE_ADDR')
+LOGIN_THROTTLE_TRUSTED_PROXIES = int(os.getenv('LOGIN_THROTTLE_TRUSTED_PROXIES', 1))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field